@@ -0,0 +1,138 @@
+import threading
+from collections import defaultdict
+
+from django.http import HttpResponse
+
+DURATION_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10,
+)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+class Histogram:
+    """Гистограмма в памяти процесса в формате Prometheus."""
+
+    def __init__(self, name, documentation, buckets, label="route"):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = buckets
+        self.label = label
+        self.lock = threading.Lock()
+        self.series = defaultdict(
+            lambda: {"buckets": [0] * len(buckets), "sum": 0, "count": 0}
+        )
+
+    def observe(self, label_value, value):
+        with self.lock:
+            series = self.series[label_value]
+            series["sum"] += value
+            series["count"] += 1
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series["buckets"][index] += 1
+
+    def collect(self):
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        with self.lock:
+            for label_value, series in sorted(self.series.items()):
+                label = f'{self.label}="{label_value}"'
+                for bound, count in zip(self.buckets, series["buckets"]):
+                    lines.append(
+                        f'{self.name}_bucket{{{label},le="{bound}"}} {count}'
+                    )
+                lines.append(
+                    f'{self.name}_bucket{{{label},le="+Inf"}} '
+                    f'{series["count"]}'
+                )
+                lines.append(f"{self.name}_sum{{{label}}} {series['sum']}")
+                lines.append(
+                    f"{self.name}_count{{{label}}} {series['count']}"
+                )
+        return lines
+
+
+class Counter:
+    def __init__(self, name, documentation, labels):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.lock = threading.Lock()
+        self.values = defaultdict(int)
+
+    def inc(self, *label_values):
+        with self.lock:
+            self.values[label_values] += 1
+
+    def collect(self):
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} counter",
+        ]
+        with self.lock:
+            for label_values, value in sorted(self.values.items()):
+                labels = ",".join(
+                    f'{label}="{label_value}"'
+                    for label, label_value in zip(self.labels, label_values)
+                )
+                lines.append(f"{self.name}{{{labels}}} {value}")
+        return lines
+
+
+REQUESTS = Counter(
+    "api_requests_total",
+    "Number of handled requests.",
+    ("route", "status"),
+)
+REQUEST_DURATION = Histogram(
+    "api_request_duration_seconds",
+    "Total time spent handling a request.",
+    DURATION_BUCKETS,
+)
+DB_DURATION = Histogram(
+    "api_db_duration_seconds",
+    "Time spent executing SQL per request.",
+    DURATION_BUCKETS,
+)
+SERIALIZE_DURATION = Histogram(
+    "api_serialize_duration_seconds",
+    "Time spent in view code and serializers, excluding SQL.",
+    DURATION_BUCKETS,
+)
+RENDER_DURATION = Histogram(
+    "api_render_duration_seconds",
+    "Time spent rendering the response body.",
+    DURATION_BUCKETS,
+)
+DB_QUERIES = Histogram(
+    "api_db_queries",
+    "Number of SQL queries per request.",
+    QUERY_BUCKETS,
+)
+RESPONSE_SIZE = Histogram(
+    "api_response_size_bytes",
+    "Size of the response body.",
+    SIZE_BUCKETS,
+)
+METRICS = (
+    REQUESTS,
+    REQUEST_DURATION,
+    DB_DURATION,
+    SERIALIZE_DURATION,
+    RENDER_DURATION,
+    DB_QUERIES,
+    RESPONSE_SIZE,
+)
+
+
+def metrics_view(request):
+    lines = []
+    for metric in METRICS:
+        lines.extend(metric.collect())
+    return HttpResponse(
+        "\n".join(lines) + "\n",
+        content_type="text/plain; version=0.0.4; charset=utf-8",
+    )
@@ -0,0 +1,173 @@
+import asyncio
+import time
+from contextvars import ContextVar
+
+from django.contrib.auth import middleware as auth
+from django.contrib.messages import middleware as messages
+from django.contrib.sessions import middleware as sessions
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.middleware import csrf
+
+from api import metrics
+
+API_PATH_PREFIX = "/api/"
+
+# Переменная контекста доходит и до потоков sync_to_async, поэтому
+# запросы к базе из любого потока попадают в метрики своего запроса.
+current_metrics = ContextVar("current_metrics", default=None)
+
+
+class RequestMetrics:
+    """Счётчики одного запроса: число и время SQL-запросов."""
+
+    def __init__(self):
+        self.queries = 0
+        self.sql_time = 0.0
+        self.started = time.perf_counter()
+        self.view_started = None
+        self.view_finished = None
+
+
+def record_query(execute, sql, params, many, context):
+    request_metrics = current_metrics.get()
+    if request_metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        request_metrics.queries += 1
+        request_metrics.sql_time += time.perf_counter() - started
+
+
+def mark_view(moment):
+    request_metrics = current_metrics.get()
+    if request_metrics is not None:
+        setattr(request_metrics, moment, time.perf_counter())
+
+
+@receiver(connection_created)
+def install_query_recorder(sender, connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class RequestMetricsMiddleware:
+    """Замеряет запросы к API по имени маршрута.
+
+    Время делится на SQL, код представления с сериализаторами (за вычетом
+    SQL) и отрисовку ответа. Значения отдаются в заголовке Server-Timing и
+    копятся в гистограммах, доступных по /metrics. Под ASGI middleware
+    работает асинхронно и не переключает потоки.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # Django вызывает __call__ и хуки без sync_to_async, только
+            # если они выглядят как корутины.
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+            self.process_view = self.aprocess_view
+            self.process_template_response = self.aprocess_template_response
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        request_metrics = RequestMetrics()
+        token = current_metrics.set(request_metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        return self.finish(request, response, request_metrics)
+
+    async def __acall__(self, request):
+        request_metrics = RequestMetrics()
+        token = current_metrics.set(request_metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        return self.finish(request, response, request_metrics)
+
+    def finish(self, request, response, request_metrics):
+        finished = time.perf_counter()
+        view_started = request_metrics.view_started or request_metrics.started
+        view_finished = request_metrics.view_finished or finished
+        sql_time = request_metrics.sql_time
+        serialize_time = max(view_finished - view_started - sql_time, 0)
+        render_time = finished - view_finished
+        total_time = finished - request_metrics.started
+        size = 0 if response.streaming else len(response.content)
+
+        response["Server-Timing"] = ", ".join((
+            f"db;dur={sql_time * 1000:.2f};"
+            f'desc="{request_metrics.queries} queries"',
+            f"serialize;dur={serialize_time * 1000:.2f}",
+            f"render;dur={render_time * 1000:.2f}",
+            f"total;dur={total_time * 1000:.2f}",
+        ))
+
+        match = request.resolver_match
+        route = match.view_name if match and match.view_name else "unmatched"
+        metrics.REQUESTS.inc(route, str(response.status_code))
+        metrics.REQUEST_DURATION.observe(route, total_time)
+        metrics.DB_DURATION.observe(route, sql_time)
+        metrics.DB_QUERIES.observe(route, request_metrics.queries)
+        metrics.SERIALIZE_DURATION.observe(route, serialize_time)
+        metrics.RENDER_DURATION.observe(route, render_time)
+        metrics.RESPONSE_SIZE.observe(route, size)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        mark_view("view_started")
+
+    def process_template_response(self, request, response):
+        # Ответы DRF отрисовываются после выхода из представления.
+        mark_view("view_finished")
+        return response
+
+    async def aprocess_view(self, request, view_func, view_args, view_kwargs):
+        mark_view("view_started")
+
+    async def aprocess_template_response(self, request, response):
+        mark_view("view_finished")
+        return response
+
+
+class SkipAPIMixin:
+    """Не выполняет middleware для запросов к API.
+
+    API аутентифицируется только по JWT, поэтому сессии, CSRF, сообщения и
+    request.user из сессии нужны лишь админке и остальным страницам.
+    """
+
+    def __call__(self, request):
+        if request.path_info.startswith(API_PATH_PREFIX):
+            return self.get_response(request)
+        return super().__call__(request)
+
+
+class SessionMiddleware(SkipAPIMixin, sessions.SessionMiddleware):
+    pass
+
+
+class CsrfViewMiddleware(SkipAPIMixin, csrf.CsrfViewMiddleware):
+    def process_view(self, request, callback, callback_args, callback_kwargs):
+        if request.path_info.startswith(API_PATH_PREFIX):
+            return None
+        return super().process_view(
+            request, callback, callback_args, callback_kwargs
+        )
+
+
+class AuthenticationMiddleware(SkipAPIMixin, auth.AuthenticationMiddleware):
+    pass
+
+
+class MessageMiddleware(SkipAPIMixin, messages.MessageMiddleware):
+    pass
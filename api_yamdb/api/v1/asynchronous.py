@@ -0,0 +1,49 @@
+import functools
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from rest_framework.permissions import SAFE_METHODS
+
+
+def call_in_pool(view, request, *args, **kwargs):
+    # Потоки пула не получают request_started/request_finished, поэтому
+    # устаревшие соединения с базой закрываются здесь.
+    close_old_connections()
+    try:
+        return view(request, *args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+def async_view(view=None, pool_methods=SAFE_METHODS):
+    """Асинхронная обёртка над синхронным представлением.
+
+    Под ASGI Django 3.2 выполняет все синхронные представления в одном
+    общем потоке. Запросы с методами из pool_methods обёртка отправляет в
+    пул потоков, остальные остаются в общем потоке. При выключенном
+    API_ASYNC_VIEWS представление возвращается без изменений.
+    """
+    if view is None:
+        return functools.partial(async_view, pool_methods=pool_methods)
+    if not settings.API_ASYNC_VIEWS:
+        return view
+    in_pool = sync_to_async(
+        functools.partial(call_in_pool, view), thread_sensitive=False
+    )
+    in_shared_thread = sync_to_async(view, thread_sensitive=True)
+
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method in pool_methods:
+            return await in_pool(request, *args, **kwargs)
+        return await in_shared_thread(request, *args, **kwargs)
+    return wrapper
+
+
+class AsyncReadViewSetMixin:
+    """Отдаёт представления вьюсета через async_view."""
+
+    @classmethod
+    def as_view(cls, actions=None, **initkwargs):
+        return async_view(super().as_view(actions, **initkwargs))
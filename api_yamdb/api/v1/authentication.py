@@ -0,0 +1,97 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import router, transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import (
+    AuthenticationFailed,
+    InvalidToken,
+)
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from reviews.models import User
+
+USER_CLAIMS = ("username", "role", "is_superuser")
+# Утверждения, от которых зависят права. Имя пользователь может сменить
+# через /users/me/, и выданные ранее токены при этом остаются в силе.
+PERMISSION_CLAIMS = ("role", "is_superuser")
+USER_STATE_FIELDS = ("id", "is_active", *USER_CLAIMS)
+USER_STATE_KEY = "auth:user:{}"
+
+
+class UserClaimsAccessToken(AccessToken):
+    """Токен доступа с данными пользователя, нужными для проверки прав."""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        for claim in USER_CLAIMS:
+            token[claim] = getattr(user, claim)
+        return token
+
+
+def get_user_state(user_id):
+    key = USER_STATE_KEY.format(user_id)
+    state = cache.get(key)
+    if state is None:
+        state = User.objects.filter(pk=user_id).values(
+            *USER_STATE_FIELDS
+        ).first() or {}
+        cache.set(key, state, settings.AUTH_USER_CACHE_TIMEOUT)
+    return state
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """Аутентификация по JWT без чтения пользователя на каждый запрос.
+
+    Пользователь собирается из утверждений токена. Проверка, что он не
+    удалён, не заблокирован и не сменил роль, идёт по закэшированному
+    состоянию, которое сбрасывается при изменении пользователя. Токены без
+    этих утверждений обрабатываются как прежде, с запросом к базе.
+    """
+
+    def get_user(self, validated_token):
+        if any(claim not in validated_token for claim in USER_CLAIMS):
+            return super().get_user(validated_token)
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken("Токен не содержит идентификатор пользователя")
+
+        state = get_user_state(user_id)
+        if not state:
+            raise AuthenticationFailed(
+                "Пользователь не найден", code="user_not_found"
+            )
+        if not state["is_active"]:
+            raise AuthenticationFailed(
+                "Пользователь неактивен", code="user_inactive"
+            )
+        if any(
+            state[claim] != validated_token[claim]
+            for claim in PERMISSION_CLAIMS
+        ):
+            raise InvalidToken(
+                "Данные пользователя изменились, получите новый токен"
+            )
+        return self.build_user(state)
+
+    def build_user(self, state):
+        # Поля, которых нет в state, остаются отложенными и загрузятся из
+        # базы только при обращении к ним.
+        field_names = []
+        values = []
+        for field in User._meta.concrete_fields:
+            if field.attname in state:
+                field_names.append(field.attname)
+                values.append(state[field.attname])
+        return User.from_db(router.db_for_read(User), field_names, values)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def reset_user_state(sender, instance, **kwargs):
+    key = USER_STATE_KEY.format(instance.pk)
+    transaction.on_commit(lambda: cache.delete(key))
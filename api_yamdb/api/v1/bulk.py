@@ -0,0 +1,186 @@
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from reviews import facets
+from reviews.models import Category, Genre, GenreTitle, Title
+from .cache import bump_versions
+
+
+def get_items(request):
+    """Список объектов из тела запроса к */bulk/."""
+    items = request.data
+    if not isinstance(items, list):
+        raise ValidationError(
+            {api_settings.NON_FIELD_ERRORS_KEY: ["Ожидается список объектов"]}
+        )
+    if len(items) > settings.API_BULK_MAX_ITEMS:
+        raise ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [
+            f"Не больше {settings.API_BULK_MAX_ITEMS} объектов за запрос"
+        ]})
+    return items
+
+
+def validate_items(serializer_class, items):
+    """Проверяет объекты по отдельности.
+
+    Возвращает пары (индекс, validated_data) для корректных объектов и
+    ошибки остальных с их индексами в запросе.
+    """
+    valid, errors = [], []
+    for index, item in enumerate(items):
+        serializer = serializer_class(data=item)
+        if serializer.is_valid():
+            valid.append((index, serializer.validated_data))
+        else:
+            errors.append({"index": index, "errors": serializer.errors})
+    return valid, errors
+
+
+def bulk_response(results, errors):
+    """Ответ с записанными объектами и ошибками остальных.
+
+    Если ни один объект не записан из-за ошибок, возвращается 400.
+    """
+    errors = sorted(errors, key=lambda error: error["index"])
+    return Response(
+        {"results": results, "errors": errors},
+        status=(
+            status.HTTP_400_BAD_REQUEST if errors and not results
+            else status.HTTP_201_CREATED
+        ),
+    )
+
+
+def upsert_by_slug(model, valid, namespace):
+    """Создаёт объекты с новыми слагами и обновляет имена существующих.
+
+    Если слаг встречается в пакете несколько раз, побеждает последний.
+    """
+    fields = dict((data["slug"], data) for _, data in valid)
+    existing = model.objects.in_bulk(list(fields), field_name="slug")
+    created, updated = [], []
+    now = timezone.now()
+    for slug, data in fields.items():
+        instance = existing.get(slug)
+        if instance is None:
+            created.append(model(**data))
+        elif instance.name != data["name"]:
+            # bulk_update не заполняет поля с auto_now.
+            instance.name = data["name"]
+            instance.updated_at = now
+            updated.append(instance)
+    with transaction.atomic():
+        model.objects.bulk_create(created)
+        model.objects.bulk_update(updated, ["name", "updated_at"])
+        # Сигналы сохранения не отправляются, кэш сбрасывается здесь.
+        bump_versions(namespace)
+    return list(fields.values())
+
+
+def resolve_slugs(valid):
+    """Ищет жанры и категории всех произведений пакета двумя запросами.
+
+    Возвращает произведения со ссылками на найденные объекты и ошибки
+    произведений с неизвестными слагами.
+    """
+    genres = Genre.objects.in_bulk(
+        {slug for _, data in valid for slug in data["genre"]},
+        field_name="slug",
+    )
+    categories = Category.objects.in_bulk(
+        {data["category"] for _, data in valid}, field_name="slug"
+    )
+    resolved, errors = [], []
+    for index, data in valid:
+        item_errors = {}
+        missing = [slug for slug in data["genre"] if slug not in genres]
+        if missing:
+            item_errors["genre"] = [
+                f"Жанр «{slug}» не существует" for slug in missing
+            ]
+        if data["category"] not in categories:
+            item_errors["category"] = [
+                f"Категория «{data['category']}» не существует"
+            ]
+        if item_errors:
+            errors.append({"index": index, "errors": item_errors})
+            continue
+        title = Title(
+            name=data["name"],
+            year=data["year"],
+            description=data.get("description", ""),
+            category=categories[data["category"]],
+        )
+        resolved.append((title, [
+            genres[slug] for slug in dict.fromkeys(data["genre"])
+        ]))
+    return resolved, errors
+
+
+def get_next_title_id(connection):
+    """Первый свободный ключ произведения на SQLite.
+
+    Таблица создана с AUTOINCREMENT, и ключи удалённых произведений не
+    должны достаться новым, поэтому учитывается и sqlite_sequence.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT MAX("
+            f"COALESCE((SELECT MAX(id) FROM {Title._meta.db_table}), 0), "
+            f"COALESCE((SELECT seq FROM sqlite_sequence WHERE name = %s), 0)"
+            f")",
+            (Title._meta.db_table,),
+        )
+        return cursor.fetchone()[0] + 1
+
+
+def insert_titles(titles):
+    """Вставляет произведения и заполняет их первичные ключи.
+
+    bulk_create в Django 3.2 возвращает ключи не на всех СУБД, а без них
+    нельзя записать связи с жанрами. На SQLite ключи назначаются заранее:
+    счётчики фасетов сдвигаются первыми, эта запись блокирует всю базу, и
+    следующий ключ не изменится до фиксации. На остальных таких СУБД
+    произведения вставляются по одному, а счётчики фасетов обновляют
+    обработчики post_save.
+    """
+    connection = connections[router.db_for_write(Title)]
+    returns_keys = connection.features.can_return_rows_from_bulk_insert
+    if not returns_keys and connection.vendor != "sqlite":
+        for title in titles:
+            title.save(force_insert=True)
+        return
+    facets.shift_titles(
+        ((title.category_id, title.year) for title in titles), 1
+    )
+    if not returns_keys:
+        first_id = get_next_title_id(connection)
+        for pk, title in enumerate(titles, start=first_id):
+            title.pk = pk
+    Title.objects.bulk_create(titles)
+
+
+def create_titles(resolved):
+    """Записывает произведения и все их связи с жанрами одним запросом."""
+    titles = [title for title, _ in resolved]
+    with transaction.atomic():
+        insert_titles(titles)
+        links = [
+            GenreTitle(title_id=title.pk, genre_id=genre.pk)
+            for title, genres in resolved
+            for genre in genres
+        ]
+        GenreTitle.objects.bulk_create(links)
+        facets.shift_genre_links(
+            ((genre.pk, title.category_id, title.year)
+             for title, genres in resolved
+             for genre in genres),
+            1,
+        )
+        bump_versions("titles")
+    return titles
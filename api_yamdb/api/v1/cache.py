@@ -0,0 +1,251 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+from django.db.models.signals import m2m_changed, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework import status
+from rest_framework.response import Response
+
+from reviews.deletion import DeleteBatch, objects_deleted
+from reviews.models import (
+    Category,
+    CollectionVersion,
+    Comment,
+    Genre,
+    Review,
+    Title,
+    User,
+)
+
+RESPONSE_KEY_PREFIX = "api:response:"
+
+# Входит в ключи всех ответов. Его версию повышают команды, которые пишут
+# в базу без сигналов моделей, например load_data и recount_counters.
+ALL_NAMESPACE = "all"
+
+
+def get_versions(namespaces):
+    """Версии и время изменения namespaces одним запросом к базе.
+
+    Возвращает словарь {namespace: (version, modified_at)}. Коллекция без
+    строки в CollectionVersion не менялась с её появления: версия 0,
+    время изменения неизвестно.
+    """
+    rows = CollectionVersion.objects.filter(
+        namespace__in=namespaces
+    ).values_list("namespace", "version", "modified_at")
+    versions = {namespace: (0, None) for namespace in namespaces}
+    versions.update(
+        (namespace, (version, modified_at))
+        for namespace, version, modified_at in rows
+    )
+    return versions
+
+
+def bump_versions(*namespaces):
+    """Делает недействительными все ответы, закэшированные для namespaces.
+
+    Вызывается в транзакции, которая пишет данные: другие процессы увидят
+    новую версию не раньше новых данных.
+    """
+    namespaces = set(namespaces)
+    now = timezone.now()
+    versions = CollectionVersion.objects.filter(namespace__in=namespaces)
+    bump = {"version": F("version") + 1, "modified_at": now}
+    if versions.update(**bump) < len(namespaces):
+        # Недостающие строки создаются с версией 0 и повышаются повторным
+        # UPDATE. Лишнее повышение уже существующих версий ничему не мешает.
+        CollectionVersion.objects.bulk_create(
+            [
+                CollectionVersion(namespace=namespace, modified_at=now)
+                for namespace in namespaces
+            ],
+            ignore_conflicts=True,
+        )
+        versions.update(**bump)
+
+
+def get_version_keys(versions):
+    # Время изменения входит в ключ, чтобы версии, заново начатые после
+    # очистки таблицы, не совпали с прежними.
+    return [
+        f"{namespace}.{version}.{modified_at}"
+        for namespace, (version, modified_at) in versions.items()
+    ]
+
+
+def get_role(user):
+    if not user.is_authenticated:
+        return "anonymous"
+    if user.is_admin:
+        return User.Role.ADMIN
+    return user.role
+
+
+class CachedResponseMixin:
+    """Кэширует ответы на GET-запросы и отвечает 304 на условные запросы.
+
+    Ключ строится из пути с параметрами запроса, роли пользователя и
+    версий пространств имён из get_version_namespaces(). Версии хранятся
+    в базе и повышаются вместе с записью данных, поэтому устаревшие ответы
+    перестают находиться по ключу во всех процессах. Тот же ключ служит
+    ETag, а время последнего повышения версий — Last-Modified: условный
+    запрос стоит одного запроса к CollectionVersion по уникальному индексу.
+    """
+
+    cache_namespaces = ()
+    namespace_versions = None
+
+    def get_cache_namespaces(self):
+        return self.cache_namespaces
+
+    def get_version_namespaces(self):
+        return (ALL_NAMESPACE, *self.get_cache_namespaces())
+
+    def get_namespace_versions(self):
+        # Версии читаются один раз за запрос: их же использует пагинация.
+        if self.namespace_versions is None:
+            self.namespace_versions = get_versions(
+                self.get_version_namespaces()
+            )
+        return self.namespace_versions
+
+    def get_cache_digest(self, request):
+        raw_key = "|".join((
+            request.get_full_path(),
+            get_role(request.user),
+            *get_version_keys(self.get_namespace_versions()),
+        ))
+        return hashlib.md5(raw_key.encode()).hexdigest()
+
+    def get_last_modified(self):
+        modified = max(
+            (
+                modified_at.timestamp()
+                for _, modified_at in self.get_namespace_versions().values()
+                if modified_at is not None
+            ),
+            default=None,
+        )
+        return None if modified is None else int(modified)
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        digest = self.get_cache_digest(request)
+        etag = f'"{digest}"'
+        last_modified = self.get_last_modified()
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = self.cached_data_response(
+                RESPONSE_KEY_PREFIX + digest,
+                handler, request, *args, **kwargs
+            )
+        if response.status_code in (
+            status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED
+        ):
+            response["ETag"] = etag
+            if last_modified is not None:
+                response["Last-Modified"] = http_date(last_modified)
+        return response
+
+    def cached_data_response(self, key, handler, request, *args, **kwargs):
+        timeout = settings.API_CACHE_TIMEOUT
+        if not timeout:
+            return handler(request, *args, **kwargs)
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            cache.set(key, response.data, timeout)
+        return response
+
+
+class CachedListMixin(CachedResponseMixin):
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+
+class CachedRetrieveMixin(CachedResponseMixin):
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+
+class CachedReadMixin(CachedListMixin, CachedRetrieveMixin):
+    pass
+
+
+@receiver(post_save, sender=Genre)
+def invalidate_genres(sender, **kwargs):
+    bump_versions("genres")
+
+
+@receiver(post_save, sender=Category)
+def invalidate_categories(sender, **kwargs):
+    bump_versions("categories")
+
+
+@receiver(post_save, sender=Title)
+@receiver(m2m_changed, sender=Title.genre.through)
+def invalidate_titles(sender, **kwargs):
+    bump_versions("titles")
+
+
+@receiver(post_save, sender=Review)
+def invalidate_reviews(sender, instance, **kwargs):
+    bump_versions("titles", f"reviews:{instance.title_id}")
+
+
+@receiver(post_save, sender=Comment)
+def invalidate_comments(sender, instance, **kwargs):
+    # Число комментариев входит в ответы со списком отзывов.
+    bump_versions(
+        f"comments:{instance.review_id}",
+        f"reviews:{instance.review.title_id}",
+    )
+
+
+@receiver(objects_deleted, sender=DeleteBatch)
+def invalidate_deleted(sender, batch, **kwargs):
+    # Каскадное удаление повышает каждую версию один раз.
+    namespaces = set()
+    if batch.get(Genre):
+        namespaces.add("genres")
+    if batch.get(Category):
+        namespaces.add("categories")
+    titles = batch.get(Title)
+    reviews = batch.get(Review)
+    if titles or reviews:
+        namespaces.add("titles")
+    namespaces.update(f"reviews:{title_id}" for title_id in titles)
+    for review_id, review in reviews.items():
+        namespaces.add(f"reviews:{review.title_id}")
+        namespaces.add(f"comments:{review_id}")
+    review_ids = set()
+    for comment in batch.get(Comment).values():
+        namespaces.add(f"comments:{comment.review_id}")
+        if comment.review_id not in reviews:
+            review_ids.add(comment.review_id)
+    if review_ids:
+        namespaces.update(
+            f"reviews:{title_id}"
+            for title_id in Review.objects.filter(
+                pk__in=review_ids
+            ).values_list("title_id", flat=True)
+        )
+    if namespaces:
+        bump_versions(*namespaces)
+
+
+@receiver(post_save, sender=User)
+def invalidate_authors(sender, created, **kwargs):
+    if not created:
+        bump_versions("authors")
@@ -1,6 +1,7 @@
 import django_filters
 
 from reviews.models import Title
+from reviews.search import search_titles
 
 
 class TitleFilter(django_filters.FilterSet):
@@ -10,7 +11,11 @@ class TitleFilter(django_filters.FilterSet):
         field_name="name",
         lookup_expr="icontains",
     )
+    search = django_filters.CharFilter(method="filter_search")
 
     class Meta:
         model = Title
         fields = ("genre", "category", "year", "name")
+
+    def filter_search(self, queryset, name, value):
+        return search_titles(queryset, value)
@@ -0,0 +1,248 @@
+import hashlib
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (
+    BasePagination,
+    LimitOffsetPagination,
+    PageNumberPagination,
+)
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from .cache import get_version_keys
+
+COUNT_KEY_PREFIX = "api:count:"
+# Параметры, от которых число объектов в списке не зависит.
+PAGINATION_QUERY_PARAMS = ("limit", "offset", "page", "cursor", "count")
+
+
+def get_count(queryset, request, view):
+    """Число объектов в списке, по возможности без COUNT(*).
+
+    Сначала число берётся из поддерживаемых счётчиков view.get_known_count(),
+    затем из кэша, где оно хранится вместе с версиями пространств имён view
+    не дольше API_COUNT_CACHE_TIMEOUT секунд. Только если этого нет,
+    выполняется COUNT(*).
+    """
+    get_known_count = getattr(view, "get_known_count", None)
+    count = get_known_count() if get_known_count else None
+    if count is not None:
+        return count
+    get_versions = getattr(view, "get_namespace_versions", None)
+    timeout = settings.API_COUNT_CACHE_TIMEOUT
+    if get_versions is None or not timeout:
+        return queryset.count()
+    params = request.query_params.copy()
+    for name in PAGINATION_QUERY_PARAMS:
+        params.pop(name, None)
+    raw_key = "|".join((
+        request.path,
+        params.urlencode(),
+        *get_version_keys(get_versions()),
+    ))
+    key = COUNT_KEY_PREFIX + hashlib.md5(raw_key.encode()).hexdigest()
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, timeout)
+    return count
+
+
+class CountedLimitOffsetPagination(LimitOffsetPagination):
+    """LimitOffsetPagination, которая считает объекты через get_count.
+
+    С параметром count=false поле count не возвращается вовсе: чтобы
+    понять, есть ли следующая страница, выбирается на один объект больше.
+    """
+
+    count_query_param = "count"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.limit = self.get_limit(request)
+        if self.limit is None:
+            return None
+        self.offset = self.get_offset(request)
+        self.request = request
+        self.with_count = request.query_params.get(
+            self.count_query_param
+        ) not in ("false", "0")
+        if not self.with_count:
+            results = list(
+                queryset[self.offset:self.offset + self.limit + 1]
+            )
+            # Следующая ссылка строится по count, поэтому он равен числу
+            # объектов до конца этой страницы и ещё одному, если они есть.
+            self.count = self.offset + len(results)
+            return results[:self.limit]
+
+        self.count = get_count(queryset, request, view)
+        if self.count > self.limit and self.template is not None:
+            self.display_page_controls = True
+        if self.count == 0 or self.offset > self.count:
+            return []
+        return list(queryset[self.offset:self.offset + self.limit])
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        if not self.with_count:
+            del response.data["count"]
+        return response
+
+
+class CountedPaginator(Paginator):
+    """Paginator, берущий число объектов из get_count, а не из COUNT."""
+
+    def __init__(self, object_list, per_page, get_count, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.get_count = get_count
+
+    @cached_property
+    def count(self):
+        return self.get_count()
+
+
+class CountedPageNumberPagination(PageNumberPagination):
+    """PageNumberPagination, которая считает объекты через get_count."""
+
+    def paginate_queryset(self, queryset, request, view=None):
+        # Число объектов запрашивается внутри super(), до того как он
+        # сохранит request.
+        self.request = request
+        self.view = view
+        return super().paginate_queryset(queryset, request, view)
+
+    def django_paginator_class(self, queryset, page_size):
+        return CountedPaginator(
+            queryset,
+            page_size,
+            lambda: get_count(queryset, self.request, self.view),
+        )
+
+
+class KeysetPagination(BasePagination):
+    """Пагинация по ключу (pub_date, id) в порядке убывания.
+
+    Страница выбирается условием по позиции из курсора, а не смещением,
+    поэтому глубокие страницы не заставляют базу пропускать строки, а
+    подсчёт общего количества не выполняется. Пустой параметр cursor
+    означает первую страницу.
+    """
+
+    cursor_query_param = "cursor"
+    page_size_query_param = "limit"
+    page_size = api_settings.PAGE_SIZE
+    invalid_cursor_message = "Неверный курсор."
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        position, reverse = self.decode_cursor(request)
+
+        if position is not None:
+            pub_date, pk = position
+            if reverse:
+                queryset = queryset.filter(
+                    Q(pub_date__gt=pub_date) | Q(pub_date=pub_date, pk__gt=pk)
+                )
+            else:
+                queryset = queryset.filter(
+                    Q(pub_date__lt=pub_date) | Q(pub_date=pub_date, pk__lt=pk)
+                )
+        if reverse:
+            queryset = queryset.order_by("pub_date", "pk")
+        else:
+            queryset = queryset.order_by("-pub_date", "-pk")
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if reverse:
+            results.reverse()
+
+        has_next = reverse or has_more
+        has_previous = position is not None and (not reverse or has_more)
+        first = (results[0].pub_date, results[0].pk) if results else position
+        last = (results[-1].pub_date, results[-1].pk) if results else position
+        self.next_position = last if has_next else None
+        self.previous_position = first if has_previous else None
+        return results
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return page_size if page_size > 0 else self.page_size
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            raw = urlsafe_b64decode(encoded.encode("ascii")).decode("ascii")
+            direction, pub_date, pk = raw.split("|")
+            pub_date = parse_datetime(pub_date)
+            pk = int(pk)
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if pub_date is None or direction not in ("n", "p"):
+            raise NotFound(self.invalid_cursor_message)
+        return (pub_date, pk), direction == "p"
+
+    def encode_cursor(self, position, reverse):
+        pub_date, pk = position
+        direction = "p" if reverse else "n"
+        raw = f"{direction}|{pub_date.isoformat()}|{pk}"
+        return urlsafe_b64encode(raw.encode("ascii")).decode("ascii")
+
+    def get_link(self, position, reverse):
+        if position is None:
+            return None
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, "offset")
+        return replace_query_param(
+            url,
+            self.cursor_query_param,
+            self.encode_cursor(position, reverse),
+        )
+
+    def get_next_link(self):
+        return self.get_link(self.next_position, reverse=False)
+
+    def get_previous_link(self):
+        return self.get_link(self.previous_position, reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ("next", self.get_next_link()),
+            ("previous", self.get_previous_link()),
+            ("results", data),
+        ]))
+
+
+class LimitOffsetOrKeysetPagination(CountedLimitOffsetPagination):
+    """CountedLimitOffsetPagination с переходом на KeysetPagination."""
+
+    keyset_pagination_class = KeysetPagination
+    keyset = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        cursor_param = self.keyset_pagination_class.cursor_query_param
+        if cursor_param not in request.query_params:
+            return super().paginate_queryset(queryset, request, view)
+        self.keyset = self.keyset_pagination_class()
+        return self.keyset.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
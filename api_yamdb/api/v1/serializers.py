@@ -1,5 +1,8 @@
+from operator import attrgetter
+
 from django.contrib.auth import get_user_model
 from django.contrib.auth.validators import UnicodeUsernameValidator
+from django.db import models
 from rest_framework import serializers
 
 from reviews.models import (
@@ -11,10 +14,92 @@ from reviews.models import (
     Title,
     User,
 )
-from reviews.validators import forbidden_username_validator
+from reviews.validators import (
+    forbidden_slug_validator,
+    forbidden_username_validator,
+)
 
 User = get_user_model()
 
+# Поля, чей to_representation сводится к приведению типа.
+SIMPLE_REPRESENTATIONS = {
+    serializers.IntegerField: int,
+    serializers.CharField: str,
+}
+
+
+def compile_field(field, model):
+    """Функция объект -> значение поля, None для неподдерживаемых."""
+    source = field.source
+    attribute = getattr(model, source, None) if "." not in source else None
+    if attribute is None or callable(attribute):
+        # Вложенные источники и методы модели остаются обычному пути DRF.
+        return None
+    get_value = attrgetter(source)
+
+    if isinstance(field, serializers.ListSerializer):
+        represent = compile_serializer(field.child)
+        if represent is None:
+            return None
+        return lambda instance: [
+            represent(item) for item in get_value(instance).all()
+        ]
+    if isinstance(field, serializers.Serializer):
+        represent = compile_serializer(field)
+    elif type(field) is serializers.SlugRelatedField:
+        represent = attrgetter(field.slug_field)
+    elif isinstance(field, (serializers.RelatedField,
+                            serializers.ManyRelatedField)):
+        return None
+    else:
+        represent = SIMPLE_REPRESENTATIONS.get(
+            type(field), field.to_representation
+        )
+    if represent is None:
+        return None
+
+    def extract(instance):
+        value = get_value(instance)
+        return None if value is None else represent(value)
+    return extract
+
+
+def compile_serializer(serializer):
+    """Функция объект -> словарь, как у serializer.to_representation."""
+    model = getattr(getattr(serializer, "Meta", None), "model", None)
+    overridden = (
+        type(serializer).to_representation
+        is not serializers.Serializer.to_representation
+    )
+    if model is None or overridden:
+        return None
+    extractors = []
+    for field in serializer._readable_fields:
+        extract = compile_field(field, model)
+        if extract is None:
+            return None
+        extractors.append((field.field_name, extract))
+
+    def represent(instance):
+        return {name: extract(instance) for name, extract in extractors}
+    return represent
+
+
+class CompiledListSerializer(serializers.ListSerializer):
+    """Список, сериализуемый функцией из compile_serializer.
+
+    Обход полей, get_attribute и проверки DRF выполняются один раз на
+    список, а не на каждый объект. Если у сериализатора есть поле, которое
+    compile_field не поддерживает, используется обычный ListSerializer.
+    """
+
+    def to_representation(self, data):
+        represent = compile_serializer(self.child)
+        if represent is None:
+            return super().to_representation(data)
+        iterable = data.all() if isinstance(data, models.Manager) else data
+        return [represent(item) for item in iterable]
+
 
 class GenreSerializer(serializers.ModelSerializer):
     """Сериализатор для моделей жанров."""
@@ -32,12 +117,30 @@ class CategorySerializer(serializers.ModelSerializer):
         fields = ("name", "slug")
 
 
+class GenreBulkSerializer(GenreSerializer):
+    """Жанр в пакетной загрузке, существующий слаг обновляет жанр."""
+
+    class Meta(GenreSerializer.Meta):
+        extra_kwargs = {"slug": {"validators": [forbidden_slug_validator]}}
+
+
+class CategoryBulkSerializer(CategorySerializer):
+    """Категория в пакетной загрузке, существующий слаг обновляет её."""
+
+    class Meta(CategorySerializer.Meta):
+        extra_kwargs = {"slug": {"validators": [forbidden_slug_validator]}}
+
+
 class TitleReadSerializer(serializers.ModelSerializer):
     """Сериализатор для чтения данных модели Title."""
 
     genre = GenreSerializer(many=True)
     category = CategorySerializer()
     rating = serializers.IntegerField(read_only=True, default=None)
+    # Каждый отзыв ставит оценку, поэтому отзывов столько же, сколько оценок.
+    review_count = serializers.IntegerField(
+        source="rating_count", read_only=True
+    )
 
     class Meta:
         model = Title
@@ -49,7 +152,9 @@ class TitleReadSerializer(serializers.ModelSerializer):
             "category",
             "description",
             "rating",
+            "review_count",
         )
+        list_serializer_class = CompiledListSerializer
 
 
 class TitleWriteSerializer(serializers.ModelSerializer):
@@ -89,6 +194,25 @@ class TitleWriteSerializer(serializers.ModelSerializer):
         return representation
 
 
+class TitleBulkSerializer(serializers.ModelSerializer):
+    """Произведение в пакетной загрузке.
+
+    Слаги жанров и категории здесь проверяются только по формату, а
+    существуют ли они, проверяется одним запросом на весь пакет.
+    """
+
+    genre = serializers.ListField(
+        child=serializers.SlugField(),
+        error_messages={"empty": "Необходимо указать жанр"},
+        allow_empty=False,
+    )
+    category = serializers.SlugField()
+
+    class Meta:
+        model = Title
+        fields = ("name", "year", "genre", "category", "description")
+
+
 class SignupSerializer(serializers.Serializer):
     """Сериализатор для регистрации пользователя."""
 
@@ -156,16 +280,10 @@ class ReviewSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Review
-        fields = ("id", "text", "author", "score", "pub_date")
-
-    def validate(self, attrs):
-        if self.context["request"].method == "POST":
-            if self.Meta.model.objects.filter(
-                author=self.context["request"].user,
-                title=self.context["view"].kwargs["title_id"],
-            ).exists():
-                raise serializers.ValidationError("Отзыв уже существует")
-        return attrs
+        fields = (
+            "id", "text", "author", "score", "pub_date", "comment_count",
+        )
+        list_serializer_class = CompiledListSerializer
 
 
 class CommentSerializer(serializers.ModelSerializer):
@@ -179,3 +297,4 @@ class CommentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Comment
         fields = ("id", "text", "author", "pub_date")
+        list_serializer_class = CompiledListSerializer
@@ -8,6 +8,7 @@ from .views import (
     ReviewViewSet,
     TitleViewSet,
     UserViewSet,
+    export,
     get_token,
     signup,
 )
@@ -33,5 +34,6 @@ v1_router.register(
 urlpatterns = [
     path("auth/signup/", signup, name="signup"),
     path("auth/token/", get_token, name="get_token"),
+    path("export/<slug:table>.<slug:output>", export, name="export"),
     path("", include(v1_router.urls)),
 ]
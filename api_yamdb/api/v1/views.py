@@ -1,31 +1,48 @@
+from tempfile import SpooledTemporaryFile
+
 from django.conf import settings
 from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
-from django.db.models import Avg
+from django.db import IntegrityError, transaction
+from django.http import FileResponse, StreamingHttpResponse
+from django.utils.functional import cached_property
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import permissions, status, viewsets
 from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.filters import SearchFilter
 from rest_framework.generics import get_object_or_404
-from rest_framework.pagination import LimitOffsetPagination
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from rest_framework.viewsets import ModelViewSet
-from rest_framework_simplejwt.tokens import AccessToken
 
-from reviews.models import Category, Genre, Review, Title, User
+from reviews import facets
+from reviews.export import FORMATS, PUBLIC_TABLES, export_lines
+from reviews.models import Category, Comment, Genre, Review, Title, User
+from reviews.outbox import queue_email
+from . import bulk
+from .asynchronous import AsyncReadViewSetMixin, async_view
+from .authentication import UserClaimsAccessToken
+from .cache import CachedReadMixin
 from .filters import TitleFilter
+from .pagination import (
+    CountedLimitOffsetPagination,
+    LimitOffsetOrKeysetPagination,
+)
 from .permissions import (
     IsAdmin,
     IsAdminOrModeratorOrAuthorOrReadOnly,
     IsAdminOrReadOnly,
 )
 from .serializers import (
+    CategoryBulkSerializer,
     CategorySerializer,
     CommentSerializer,
+    GenreBulkSerializer,
     GenreSerializer,
     ReviewSerializer,
     SignupSerializer,
+    TitleBulkSerializer,
     TitleReadSerializer,
     TitleWriteSerializer,
     TokenSerializer,
@@ -38,15 +55,23 @@ from .viewsets import ListCreateDestroyViewSet
 class CategoryViewSet(ListCreateDestroyViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
+    bulk_serializer_class = CategoryBulkSerializer
+    cache_namespaces = ("categories",)
 
 
 class GenreViewSet(ListCreateDestroyViewSet):
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
+    bulk_serializer_class = GenreBulkSerializer
+    cache_namespaces = ("genres",)
 
 
-class TitleViewSet(viewsets.ModelViewSet):
-    queryset = Title.objects.annotate(rating=Avg("reviews__score"))
+class TitleViewSet(
+    AsyncReadViewSetMixin, CachedReadMixin, viewsets.ModelViewSet
+):
+    queryset = Title.objects.select_related("category").prefetch_related(
+        "genre",
+    )
     permission_classes = (IsAdminOrReadOnly,)
     search_fields = ("name",)
     filter_backends = (DjangoFilterBackend,)
@@ -57,14 +82,82 @@ class TitleViewSet(viewsets.ModelViewSet):
         "patch",
         "delete",
     ]
-    pagination_class = LimitOffsetPagination
+    pagination_class = CountedLimitOffsetPagination
+    cache_namespaces = ("titles", "genres", "categories")
 
     def get_serializer_class(self):
         if self.request.method in permissions.SAFE_METHODS:
             return TitleReadSerializer
         return TitleWriteSerializer
 
+    @action(detail=False, methods=["post"])
+    def bulk(self, request):
+        valid, errors = bulk.validate_items(
+            TitleBulkSerializer, bulk.get_items(request)
+        )
+        resolved, missing = bulk.resolve_slugs(valid)
+        titles = bulk.create_titles(resolved)
+        results = TitleReadSerializer(
+            self.get_queryset().filter(
+                pk__in=[title.pk for title in titles]
+            ).order_by("pk"),
+            many=True,
+        ).data
+        return bulk.bulk_response(results, errors + missing)
+
+    @action(detail=False)
+    def facets(self, request):
+        return self.cached_response(self.get_facets, request)
+
+    def filter_titles(self, params):
+        filterset = self.filterset_class(
+            params, queryset=Title.objects.all(), request=self.request
+        )
+        if not filterset.is_valid():
+            raise ValidationError(filterset.errors)
+        return filterset
+
+    def get_facet_filters(self, values):
+        """Фильтры для счётчиков фасетов, None — если их не хватает."""
+        if values.get("name") or values.get("search"):
+            return None
+        year = values.get("year")
+        return {
+            "genre": values.get("genre") or None,
+            "category": values.get("category") or None,
+            "year": None if year is None else int(year),
+        }
+
+    def get_known_count(self):
+        filterset = self.filter_titles(self.request.query_params)
+        filters = self.get_facet_filters(filterset.form.cleaned_data)
+        # Без жанра и категории пришлось бы суммировать все счётчики,
+        # такое число дешевле закэшировать.
+        if filters is None or not (filters["genre"] or filters["category"]):
+            return None
+        return facets.get_title_count(**filters)
+
+    def get_facets(self, request):
+        params = request.query_params
+        values = self.filter_titles(params).form.cleaned_data
+        filters = self.get_facet_filters(values)
+        if filters is not None:
+            return Response(facets.get_facets(**filters))
+
+        # Поиск по тексту счётчики не покрывают, остаётся группировка.
+        def titles_without(name):
+            rest = params.copy()
+            rest.pop(name, None)
+            return self.filter_titles(rest).qs
+        return Response(facets.count_titles(
+            titles_without("genre"),
+            titles_without("category"),
+            titles_without("year"),
+        ))
 
+
+# Отправка письма при EMAIL_OUTBOX_EAGER не занимает общий поток ASGI.
+@async_view(pool_methods=("POST",))
 @api_view(["POST"])
 @permission_classes((AllowAny,))
 def signup(request):
@@ -72,15 +165,14 @@ def signup(request):
     serializer.is_valid(raise_exception=True)
     username = serializer.validated_data["username"]
     email = serializer.validated_data["email"]
-    user, _ = User.objects.get_or_create(username=username, email=email)
-    confirmation_code = default_token_generator.make_token(user)
-    send_mail(
-        "Ваш код подтверждения",
-        f"Ваш код подтверждения: {confirmation_code}",
-        settings.DEFAULT_FROM_EMAIL,
-        [user.email],
-        fail_silently=False,
-    )
+    with transaction.atomic():
+        user, _ = User.objects.get_or_create(username=username, email=email)
+        confirmation_code = default_token_generator.make_token(user)
+        queue_email(
+            "Ваш код подтверждения",
+            f"Ваш код подтверждения: {confirmation_code}",
+            user.email,
+        )
     return Response(
         {"email": user.email, "username": user.username},
         status=status.HTTP_200_OK,
@@ -105,10 +197,52 @@ def get_token(request):
             status=status.HTTP_400_BAD_REQUEST,
         )
 
-    token = AccessToken.for_user(user)
+    token = UserClaimsAccessToken.for_user(user)
     return Response({"token": str(token)}, status=status.HTTP_200_OK)
 
 
+EXPORT_CONTENT_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson; charset=utf-8",
+}
+# Выгрузка под ASGI сначала пишется во временный файл, в памяти — до
+# этого размера.
+EXPORT_SPOOL_SIZE = 8 * 1024 * 1024
+
+
+def spool(chunks):
+    spooled = SpooledTemporaryFile(max_size=EXPORT_SPOOL_SIZE)
+    for chunk in chunks:
+        spooled.write(chunk)
+    spooled.seek(0)
+    return spooled
+
+
+@async_view
+@api_view(["GET"])
+@permission_classes((permissions.IsAuthenticated,))
+def export(request, table, output):
+    """Потоковая выгрузка таблицы целиком в формате CSV или NDJSON."""
+    if table not in PUBLIC_TABLES or output not in FORMATS:
+        raise NotFound()
+    chunks = (line.encode() for line in export_lines(table, output))
+    filename = f"{table}.{output}"
+    if settings.API_ASYNC_VIEWS:
+        # Django 3.2 перебирает потоковый ответ в цикле событий, где ORM
+        # недоступен, поэтому запросы выполняются здесь, в пуле потоков.
+        return FileResponse(
+            spool(chunks),
+            as_attachment=True,
+            filename=filename,
+            content_type=EXPORT_CONTENT_TYPES[output],
+        )
+    response = StreamingHttpResponse(
+        chunks, content_type=EXPORT_CONTENT_TYPES[output]
+    )
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+
 class UserViewSet(viewsets.ModelViewSet):
     queryset = User.objects.all()
     permission_classes = (IsAdmin,)
@@ -124,11 +258,12 @@ class UserViewSet(viewsets.ModelViewSet):
         permission_classes=[permissions.IsAuthenticated],
     )
     def me(self, request):
+        user = get_object_or_404(User, pk=request.user.pk)
         if request.method == "GET":
-            serializer = self.get_serializer(request.user)
+            serializer = self.get_serializer(user)
             return Response(serializer.data)
         serializer = self.get_serializer(
-            request.user,
+            user,
             data=request.data,
             partial=True,
         )
@@ -142,39 +277,84 @@ class UserViewSet(viewsets.ModelViewSet):
         return UserSerializer
 
 
-class ReviewViewSet(ModelViewSet):
+class ReviewViewSet(AsyncReadViewSetMixin, CachedReadMixin, ModelViewSet):
     serializer_class = ReviewSerializer
-    pagination_class = LimitOffsetPagination
+    pagination_class = LimitOffsetOrKeysetPagination
     permission_classes = (IsAdminOrModeratorOrAuthorOrReadOnly,)
     http_method_names = ["get", "post", "patch", "delete"]
 
-    def _get_title(self):
+    def get_cache_namespaces(self):
+        return (f"reviews:{self.kwargs['title_id']}", "authors")
+
+    @cached_property
+    def title(self):
         return get_object_or_404(Title, id=self.kwargs["title_id"])
 
     def get_queryset(self):
-        return self._get_title().reviews.all()
+        return Review.objects.filter(
+            title_id=self.kwargs["title_id"]
+        ).select_related("author")
+
+    def get_known_count(self):
+        # Число отзывов совпадает с числом оценок произведения.
+        return self.title.rating_count
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        if not page:
+            self.title
+        return page
 
     def perform_create(self, serializer):
-        serializer.save(author=self.request.user, title=self._get_title())
+        # Повторный отзыв отсекает ограничение unique_review, а не
+        # отдельный запрос перед вставкой.
+        try:
+            serializer.save(author=self.request.user, title=self.title)
+        except IntegrityError:
+            # Ошибку вызвало другое ограничение, например внешний ключ
+            # удалённого в это время произведения.
+            if not Review.objects.filter(
+                title=self.title, author=self.request.user
+            ).exists():
+                raise
+            raise ValidationError(
+                {api_settings.NON_FIELD_ERRORS_KEY: ["Отзыв уже существует"]}
+            )
 
 
-class CommentViewSet(ModelViewSet):
+class CommentViewSet(AsyncReadViewSetMixin, CachedReadMixin, ModelViewSet):
     serializer_class = CommentSerializer
-    pagination_class = LimitOffsetPagination
+    pagination_class = LimitOffsetOrKeysetPagination
     permission_classes = (IsAdminOrModeratorOrAuthorOrReadOnly,)
     http_method_names = ["get", "post", "patch", "delete"]
 
-    def _get_review(self):
+    def get_cache_namespaces(self):
+        return (f"comments:{self.kwargs['review_id']}", "authors")
+
+    @cached_property
+    def review(self):
         return get_object_or_404(
             Review,
             id=self.kwargs["review_id"],
             title__id=self.kwargs["title_id"],
         )
 
+    def get_known_count(self):
+        return self.review.comment_count
+
     def get_queryset(self):
-        return self._get_review().comments.all()
+        return Comment.objects.filter(
+            review_id=self.kwargs["review_id"],
+            review__title_id=self.kwargs["title_id"],
+        ).select_related("author")
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        if not page:
+            # Пустая страница не отличает отзыв без комментариев от
+            # несуществующего, поэтому только здесь отзыв проверяется.
+            self.review
+        return page
 
     def perform_create(self, serializer):
-        review = self._get_review()
-        user = self.request.user
-        serializer.save(author=user, review=review)
+        serializer.save(author=self.request.user, review=self.review)
@@ -1,10 +1,16 @@
 from rest_framework import mixins, viewsets
+from rest_framework.decorators import action
 from rest_framework.filters import SearchFilter
 
+from . import bulk
+from .asynchronous import AsyncReadViewSetMixin
+from .cache import CachedListMixin
 from .permissions import IsAdminOrReadOnly
 
 
 class ListCreateDestroyViewSet(
+    AsyncReadViewSetMixin,
+    CachedListMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     mixins.DestroyModelMixin,
@@ -14,3 +20,16 @@ class ListCreateDestroyViewSet(
     filter_backends = (SearchFilter,)
     search_fields = ("name",)
     lookup_field = "slug"
+
+    bulk_serializer_class = None
+
+    @action(detail=False, methods=["post"])
+    def bulk(self, request):
+        """Создаёт объекты с новыми слагами и переименовывает остальные."""
+        valid, errors = bulk.validate_items(
+            self.bulk_serializer_class, bulk.get_items(request)
+        )
+        results = bulk.upsert_by_slug(
+            self.queryset.model, valid, *self.cache_namespaces
+        )
+        return bulk.bulk_response(results, errors)
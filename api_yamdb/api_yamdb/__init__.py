@@ -0,0 +1,2 @@
+# Подключает обработчик соединений до первого обращения к базе.
+from api_yamdb import db  # noqa: F401
@@ -3,5 +3,6 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "api_yamdb.settings")
+os.environ.setdefault("API_ASYNC_VIEWS", "true")
 
 application = get_asgi_application()
@@ -1,3 +1,4 @@
+import os
 from datetime import timedelta
 from pathlib import Path
 
@@ -25,12 +26,13 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "api.middleware.RequestMetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
-    "django.contrib.sessions.middleware.SessionMiddleware",
+    "api.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
-    "django.middleware.csrf.CsrfViewMiddleware",
-    "django.contrib.auth.middleware.AuthenticationMiddleware",
-    "django.contrib.messages.middleware.MessageMiddleware",
+    "api.middleware.CsrfViewMiddleware",
+    "api.middleware.AuthenticationMiddleware",
+    "api.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
@@ -56,13 +58,73 @@ TEMPLATES = [
 WSGI_APPLICATION = "api_yamdb.wsgi.application"
 
 
-DATABASES = {
-    "default": {
+DB_CONN_MAX_AGE = int(os.getenv("DB_CONN_MAX_AGE", 600))
+
+DATABASE_PROFILES = {
+    "sqlite": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
-    }
+    },
+    "sqlite-production": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": os.getenv("DB_NAME", BASE_DIR / "db.sqlite3"),
+        "CONN_MAX_AGE": DB_CONN_MAX_AGE,
+        # Сколько секунд ждать снятия блокировки записи.
+        "OPTIONS": {"timeout": int(os.getenv("DB_BUSY_TIMEOUT", 20))},
+    },
+    "postgresql": {
+        "ENGINE": "django.db.backends.postgresql",
+        "NAME": os.getenv("DB_NAME", "api_yamdb"),
+        "USER": os.getenv("DB_USER", "api_yamdb"),
+        "PASSWORD": os.getenv("DB_PASSWORD", ""),
+        "HOST": os.getenv("DB_HOST", "localhost"),
+        "PORT": os.getenv("DB_PORT", "5432"),
+        "CONN_MAX_AGE": DB_CONN_MAX_AGE,
+        # За PgBouncer в режиме transaction серверные курсоры не работают.
+        "DISABLE_SERVER_SIDE_CURSORS": os.getenv(
+            "DB_PGBOUNCER", "false"
+        ).lower() in ("1", "true", "yes"),
+        "OPTIONS": {"connect_timeout": 5},
+    },
 }
 
+DB_PROFILE = os.getenv("DB_PROFILE", "sqlite")
+
+DATABASES = {
+    "default": DATABASE_PROFILES[DB_PROFILE],
+}
+
+# Выполняются для каждого нового соединения с SQLite, см. api_yamdb/db.py.
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "mmap_size": 256 * 1024 * 1024,
+    "cache_size": -64 * 1024,
+    "temp_store": "MEMORY",
+} if DB_PROFILE == "sqlite-production" else {}
+
+CACHE_BACKENDS = {
+    "locmem": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "file": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": BASE_DIR / "cache",
+    },
+}
+
+CACHES = {
+    "default": CACHE_BACKENDS[os.getenv("CACHE_BACKEND", "locmem")],
+}
+
+API_CACHE_TIMEOUT = int(os.getenv("API_CACHE_TIMEOUT", 300))
+
+# Сколько секунд хранится число объектов отфильтрованного списка.
+API_COUNT_CACHE_TIMEOUT = int(os.getenv("API_COUNT_CACHE_TIMEOUT", 60))
+
+# Наибольшее число объектов в одном запросе к */bulk/.
+API_BULK_MAX_ITEMS = int(os.getenv("API_BULK_MAX_ITEMS", 1000))
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -98,12 +160,23 @@ AUTH_USER_MODEL = "reviews.User"
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "api.v1.authentication.ClaimsJWTAuthentication",
+    ),
+    "DEFAULT_RENDERER_CLASSES": (
+        "api.v1.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    "DEFAULT_PARSER_CLASSES": (
+        "api.v1.parsers.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
     ),
     "DEFAULT_FILTER_BACKENDS": [
         "django_filters.rest_framework.DjangoFilterBackend",
     ],
-    "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
+    "DEFAULT_PAGINATION_CLASS": (
+        "api.v1.pagination.CountedPageNumberPagination"
+    ),
     "PAGE_SIZE": 10,
 }
 
@@ -114,8 +187,31 @@ SIMPLE_JWT = {
     "TOKEN_TYPE_CLAIM": "token_type",
 }
 
-EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
+AUTH_USER_CACHE_TIMEOUT = 60
+
+# Под ASGI чтение из API выполняется в пуле потоков (включается в asgi.py).
+API_ASYNC_VIEWS = os.getenv(
+    "API_ASYNC_VIEWS", "false"
+).lower() in ("1", "true", "yes")
+
+EMAIL_BACKEND = os.getenv(
+    "EMAIL_BACKEND",
+    "django.core.mail.backends.console.EmailBackend",
+)
 
 EMAIL_FILE_PATH = BASE_DIR / "sent_emails"
 
 DEFAULT_FROM_EMAIL = "no-reply@example.com"
+
+EMAIL_OUTBOX_EAGER = os.getenv(
+    "EMAIL_OUTBOX_EAGER", "False"
+).lower() in ("1", "true", "yes")
+
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+
+EMAIL_OUTBOX_RETRY_DELAY = 60
+
+EMAIL_OUTBOX_MAX_RETRY_DELAY = 60 * 60
+
+# Сколько секунд взятое в отправку письмо недоступно другим отправителям.
+EMAIL_OUTBOX_LEASE = 5 * 60
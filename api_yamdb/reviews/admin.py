@@ -1,8 +1,41 @@
 from django.contrib import admin
 
-from .models import Category, Comment, Genre, Review, Title
+from . import facets
+from .models import (
+    Category,
+    Comment,
+    Genre,
+    GenreTitle,
+    OutgoingEmail,
+    Review,
+    Title,
+)
 
 
-@admin.register(Title, Review, Comment, Category, Genre)
+class GenreTitleInline(admin.TabularInline):
+    model = GenreTitle
+    extra = 1
+
+
+@admin.register(Review, Comment, Category, Genre, OutgoingEmail)
 class ReviewAdmin(admin.ModelAdmin):
     pass
+
+
+@admin.register(Title)
+class TitleAdmin(admin.ModelAdmin):
+    inlines = (GenreTitleInline,)
+
+    def save_related(self, request, form, formsets, change):
+        # Инлайн сохраняет связи с жанрами напрямую, без m2m_changed.
+        title = form.instance
+        links = GenreTitle.objects.filter(title=title)
+        before = set(links.values_list("genre_id", flat=True))
+        super().save_related(request, form, formsets, change)
+        after = set(links.values_list("genre_id", flat=True))
+        for genre_ids, delta in ((after - before, 1), (before - after, -1)):
+            facets.shift_genre_links(
+                ((genre_id, title.category_id, title.year)
+                 for genre_id in genre_ids),
+                delta,
+            )
@@ -10,3 +10,5 @@ MIN_SCORE = 1
 MAX_SCORE = 10
 VALIDATOR_ERROR_MESSAGE = f"Оценка должна быть от {MIN_SCORE} до {MAX_SCORE}"
 FORBIDDEN_USERNAMES = ("me",)
+# Совпадают с путями действий списков жанров и категорий, например bulk/.
+FORBIDDEN_SLUGS = ("bulk",)
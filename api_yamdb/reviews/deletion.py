@@ -0,0 +1,75 @@
+import threading
+from collections import defaultdict
+
+from django.db import connections
+from django.db.models.signals import post_delete, pre_delete
+from django.dispatch import Signal, receiver
+
+from reviews.models import Category, Comment, Genre, Review, Title
+
+# Отправляется один раз на удаление со всеми удалёнными объектами
+# отслеживаемых моделей, включая каскадные: batch.deleted — словарь
+# {model: {pk: instance}}. Обработчики вызываются после удаления строк
+# первой модели, поэтому смотрят только на объекты, которые остаются.
+objects_deleted = Signal()
+
+TRACKED_MODELS = (Genre, Category, Title, Review, Comment)
+
+_state = threading.local()
+
+
+class DeleteBatch:
+    """Объекты, удаляемые одним вызовом delete() вместе с каскадом.
+
+    Collector сначала отправляет pre_delete для всех объектов, потом
+    удаляет строки и отправляет post_delete. Пакет собирается по
+    pre_delete и отправляется по первому post_delete.
+    """
+
+    def __init__(self, using):
+        self.using = using
+        self.deleted = defaultdict(dict)
+        self.closed = False
+        # Если удаление откатится, обработчик пропадёт из очереди
+        # on_commit, и следующее удаление начнёт новый пакет.
+        connections[using].on_commit(self.close)
+
+    def close(self):
+        self.closed = True
+
+    def is_open(self):
+        if self.closed:
+            return False
+        return any(
+            func == self.close
+            for _, func in connections[self.using].run_on_commit
+        )
+
+    def get(self, model):
+        return self.deleted.get(model, {})
+
+
+def get_batches():
+    if not hasattr(_state, "batches"):
+        _state.batches = {}
+    return _state.batches
+
+
+def collect_deleted(sender, instance, using, **kwargs):
+    batches = get_batches()
+    batch = batches.get(using)
+    if batch is None or not batch.is_open():
+        batch = batches[using] = DeleteBatch(using)
+    batch.deleted[sender][instance.pk] = instance
+
+
+def send_deleted(sender, using, **kwargs):
+    batch = get_batches().pop(using, None)
+    if batch is not None and batch.is_open():
+        batch.close()
+        objects_deleted.send(sender=DeleteBatch, batch=batch)
+
+
+for model in TRACKED_MODELS:
+    receiver(pre_delete, sender=model)(collect_deleted)
+    receiver(post_delete, sender=model)(send_deleted)
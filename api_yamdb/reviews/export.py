@@ -0,0 +1,108 @@
+import csv
+import json
+from datetime import datetime
+
+from reviews.models import Category, Comment, Genre, Review, Title, User
+
+DEFAULT_CHUNK_SIZE = 2000
+
+# Таблица -> (файл для load_data, модель, столбцы: имя в файле -> поле).
+EXPORT_TABLES = {
+    "users": ("users.csv", User, {
+        "id": "id",
+        "username": "username",
+        "email": "email",
+        "role": "role",
+        "bio": "bio",
+        "first_name": "first_name",
+        "last_name": "last_name",
+    }),
+    "category": ("category.csv", Category, {
+        "id": "id", "name": "name", "slug": "slug",
+    }),
+    "genre": ("genre.csv", Genre, {
+        "id": "id", "name": "name", "slug": "slug",
+    }),
+    "titles": ("titles.csv", Title, {
+        "id": "id",
+        "name": "name",
+        "year": "year",
+        "category": "category_id",
+        "description": "description",
+    }),
+    "genre_title": ("genre_title.csv", Title.genre.through, {
+        "id": "id", "title_id": "title_id", "genre_id": "genre_id",
+    }),
+    "review": ("review.csv", Review, {
+        "id": "id",
+        "title_id": "title_id",
+        "text": "text",
+        "author": "author_id",
+        "score": "score",
+        "pub_date": "pub_date",
+    }),
+    "comments": ("comments.csv", Comment, {
+        "id": "id",
+        "review_id": "review_id",
+        "text": "text",
+        "author": "author_id",
+        "pub_date": "pub_date",
+    }),
+}
+
+# Таблицы, которые отдаёт API: в users есть адреса почты.
+PUBLIC_TABLES = tuple(table for table in EXPORT_TABLES if table != "users")
+
+FORMATS = ("csv", "ndjson")
+
+
+def iterate_rows(model, fields, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Строки таблицы по возрастанию первичного ключа, пачками по ключу.
+
+    Каждая пачка — отдельный короткий запрос, поэтому память не растёт с
+    размером таблицы, а курсор и транзакция не держатся открытыми, пока
+    медленный клиент читает ответ.
+    """
+    rows = model.objects.order_by("pk").values_list("pk", *fields)
+    last_pk = None
+    while True:
+        chunk = rows if last_pk is None else rows.filter(pk__gt=last_pk)
+        chunk = list(chunk[:chunk_size])
+        if not chunk:
+            return
+        last_pk = chunk[-1][0]
+        for row in chunk:
+            yield row[1:]
+        if len(chunk) < chunk_size:
+            return
+
+
+def format_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+class Echo:
+    """Файл для csv.writer, который возвращает записанную строку."""
+
+    def write(self, value):
+        return value
+
+
+def export_lines(table, output, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Строки выгрузки таблицы в формате output (csv или ndjson)."""
+    _, model, columns = EXPORT_TABLES[table]
+    rows = iterate_rows(model, columns.values(), chunk_size)
+    if output == "csv":
+        writer = csv.writer(Echo())
+        yield writer.writerow(columns)
+        for row in rows:
+            yield writer.writerow(
+                "" if value is None else format_value(value) for value in row
+            )
+        return
+    for row in rows:
+        yield json.dumps(
+            dict(zip(columns, map(format_value, row))), ensure_ascii=False
+        ) + "\n"
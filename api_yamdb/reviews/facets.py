@@ -0,0 +1,192 @@
+from collections import Counter
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+
+from reviews.models import (
+    CategoryYearCount,
+    GenreCategoryYearCount,
+    GenreTitle,
+    Title,
+)
+
+
+def shift_count(model, delta, **key):
+    """Сдвигает счётчик model с ключом key, создавая его при необходимости."""
+    if not delta:
+        return
+    counters = model.objects.filter(**key)
+    if counters.update(count=F("count") + delta):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(count=delta, **key)
+    except IntegrityError:
+        # Счётчик успела создать параллельная транзакция.
+        counters.update(count=F("count") + delta)
+
+
+def shift_genre_links(links, delta):
+    """Сдвигает счётчики жанров для пар (genre_id, category_id, year)."""
+    for (genre_id, category_id, year), count in Counter(links).items():
+        shift_count(
+            GenreCategoryYearCount,
+            delta * count,
+            genre_id=genre_id,
+            category_id=category_id,
+            year=year,
+        )
+
+
+def shift_titles(keys, delta):
+    """Сдвигает счётчики категорий для пар (category_id, year)."""
+    for (category_id, year), count in Counter(keys).items():
+        shift_count(
+            CategoryYearCount,
+            delta * count,
+            category_id=category_id,
+            year=year,
+        )
+
+
+def shift_title(category_id, year, genre_ids, delta):
+    """Учитывает (delta=1) или убирает (delta=-1) произведение."""
+    shift_count(CategoryYearCount, delta, category_id=category_id, year=year)
+    shift_genre_links(
+        ((genre_id, category_id, year) for genre_id in genre_ids), delta
+    )
+
+
+def get_genre_links(links):
+    """Пары (genre_id, category_id, year) для связей жанров из links."""
+    return links.values_list("genre_id", "title__category_id", "title__year")
+
+
+def move_category_to_none(category_id):
+    """Переносит счётчики удаляемой категории к произведениям без неё."""
+    for model in (CategoryYearCount, GenreCategoryYearCount):
+        counters = model.objects.filter(category_id=category_id)
+        for key in counters.values():
+            del key["id"]
+            count = key.pop("count")
+            key["category_id"] = None
+            shift_count(model, count, **key)
+        counters.delete()
+
+
+def recount_facets():
+    """Пересобирает счётчики фасетов по произведениям и их жанрам."""
+    CategoryYearCount.objects.all().delete()
+    GenreCategoryYearCount.objects.all().delete()
+    CategoryYearCount.objects.bulk_create(
+        CategoryYearCount(**row)
+        for row in Title.objects.order_by().values(
+            "category_id", "year"
+        ).annotate(count=Count("pk"))
+    )
+    GenreCategoryYearCount.objects.bulk_create(
+        GenreCategoryYearCount(
+            genre_id=genre_id, category_id=category_id, year=year, count=count
+        )
+        for genre_id, category_id, year, count in get_genre_links(
+            GenreTitle.objects.order_by()
+        ).annotate(count=Count("pk"))
+    )
+
+
+def get_title_count(genre=None, category=None, year=None):
+    """Число произведений с фильтрами по слагам жанра и категории и году."""
+    if genre is not None:
+        counters = GenreCategoryYearCount.objects.filter(genre__slug=genre)
+    else:
+        counters = CategoryYearCount.objects.all()
+    if category is not None:
+        counters = counters.filter(category__slug=category)
+    if year is not None:
+        counters = counters.filter(year=year)
+    return counters.aggregate(total=Sum("count"))["total"] or 0
+
+
+def count_by(rows, *fields, total=Sum("count")):
+    """Группирует rows по fields, отбрасывая пустые группы."""
+    return list(
+        rows.order_by().values(*fields).annotate(
+            count=total
+        ).filter(count__gt=0).order_by(*fields)
+    )
+
+
+def shape(genres, categories, years):
+    return {
+        "genres": [
+            {"name": row["genre__name"], "slug": row["genre__slug"],
+             "count": row["count"]}
+            for row in genres
+        ],
+        "categories": [
+            {"name": row["category__name"], "slug": row["category__slug"],
+             "count": row["count"]}
+            for row in categories
+        ],
+        "years": years,
+    }
+
+
+def get_facets(genre=None, category=None, year=None):
+    """Число произведений по жанрам, категориям и годам.
+
+    Каждый фасет учитывает все фильтры, кроме своего собственного, чтобы
+    показывать, сколько произведений даст выбор другого значения.
+    """
+    by_genre = GenreCategoryYearCount.objects.all()
+    by_category = CategoryYearCount.objects.all()
+    if genre is not None:
+        # С фильтром по жанру категории и годы считаются по его счётчикам.
+        by_category = GenreCategoryYearCount.objects.filter(
+            genre__slug=genre
+        )
+
+    genres = by_genre
+    if category is not None:
+        genres = genres.filter(category__slug=category)
+    if year is not None:
+        genres = genres.filter(year=year)
+
+    categories = by_category.filter(category__isnull=False)
+    if year is not None:
+        categories = categories.filter(year=year)
+
+    years = by_category
+    if category is not None:
+        years = years.filter(category__slug=category)
+
+    return shape(
+        count_by(genres, "genre__name", "genre__slug"),
+        count_by(categories, "category__name", "category__slug"),
+        count_by(years, "year"),
+    )
+
+
+def count_titles(genre_titles, category_titles, year_titles):
+    """Те же фасеты группировкой по отобранным произведениям.
+
+    Нужны для фильтров, которые счётчики не покрывают (name, search).
+    Каждый набор произведений отфильтрован без учёта своего фасета.
+    """
+    total = Count("pk")
+    return shape(
+        count_by(
+            GenreTitle.objects.filter(title__in=genre_titles.values("pk")),
+            "genre__name", "genre__slug", total=total,
+        ),
+        count_by(
+            Title.objects.filter(
+                pk__in=category_titles.values("pk"), category__isnull=False
+            ),
+            "category__name", "category__slug", total=total,
+        ),
+        count_by(
+            Title.objects.filter(pk__in=year_titles.values("pk")),
+            "year", total=total,
+        ),
+    )
@@ -0,0 +1,68 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand
+
+from reviews.export import (
+    DEFAULT_CHUNK_SIZE,
+    EXPORT_TABLES,
+    FORMATS,
+    export_lines,
+)
+
+
+class Command(BaseCommand):
+    help = "Export tables into files compatible with load_data"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "directory", type=str, help="Directory to write files into")
+        parser.add_argument(
+            "--format",
+            choices=FORMATS,
+            default="csv",
+            help="Output format, csv files can be loaded with load_data",
+        )
+        parser.add_argument(
+            "--tables",
+            nargs="+",
+            choices=list(EXPORT_TABLES),
+            default=list(EXPORT_TABLES),
+            help="Tables to export",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help="Number of rows fetched per query",
+        )
+
+    def handle(self, *args, **kwargs):
+        directory = kwargs["directory"]
+        os.makedirs(directory, exist_ok=True)
+        for table in kwargs["tables"]:
+            filename, _, _ = EXPORT_TABLES[table]
+            if kwargs["format"] != "csv":
+                filename = f"{table}.{kwargs['format']}"
+            self.export_file(
+                os.path.join(directory, filename),
+                table,
+                kwargs["format"],
+                kwargs["chunk_size"],
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'Successfully exported data to "{directory}"'))
+
+    def export_file(self, path, table, output, chunk_size):
+        started = time.monotonic()
+        total = -1 if output == "csv" else 0
+        with open(path, "w", encoding="utf-8", newline="") as export_file:
+            for line in export_lines(table, output, chunk_size):
+                export_file.write(line)
+                total += 1
+        elapsed = time.monotonic() - started
+        rate = total / elapsed if elapsed else total
+        self.stdout.write(
+            f"{os.path.basename(path)}: {total} rows "
+            f"in {elapsed:.2f}s ({rate:.0f} rows/s)"
+        )
@@ -1,6 +1,117 @@
+import csv
 import os
+import time
+from contextlib import contextmanager
+from itertools import islice
 
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
 from django.core.management.base import BaseCommand
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.utils.dateparse import parse_datetime
+
+from api.v1.cache import ALL_NAMESPACE, bump_versions
+from reviews.models import Category, Comment, Genre, Review, Title, User
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+def build_user(row):
+    return User(
+        id=row["id"],
+        username=row["username"],
+        email=row["email"],
+        role=row["role"],
+        bio=row["bio"],
+        first_name=row["first_name"],
+        last_name=row["last_name"],
+        password=make_password(None),
+    )
+
+
+def build_category(row):
+    return Category(id=row["id"], name=row["name"], slug=row["slug"])
+
+
+def build_genre(row):
+    return Genre(id=row["id"], name=row["name"], slug=row["slug"])
+
+
+def build_title(row):
+    return Title(
+        id=row["id"],
+        name=row["name"],
+        year=row["year"],
+        category_id=row["category"] or None,
+        description=row.get("description", ""),
+    )
+
+
+def build_genre_title(row):
+    return Title.genre.through(
+        id=row["id"],
+        title_id=row["title_id"],
+        genre_id=row["genre_id"],
+    )
+
+
+def build_review(row):
+    return Review(
+        id=row["id"],
+        title_id=row["title_id"],
+        text=row["text"],
+        author_id=row["author"],
+        score=row["score"],
+        pub_date=parse_datetime(row["pub_date"]),
+    )
+
+
+def build_comment(row):
+    return Comment(
+        id=row["id"],
+        review_id=row["review_id"],
+        text=row["text"],
+        author_id=row["author"],
+        pub_date=parse_datetime(row["pub_date"]),
+    )
+
+
+# Порядок важен: таблицы загружаются раньше тех, что на них ссылаются.
+CSV_FILES = (
+    ("users.csv", User, build_user),
+    ("category.csv", Category, build_category),
+    ("genre.csv", Genre, build_genre),
+    ("titles.csv", Title, build_title),
+    ("genre_title.csv", Title.genre.through, build_genre_title),
+    ("review.csv", Review, build_review),
+    ("comments.csv", Comment, build_comment),
+)
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+@contextmanager
+def keep_auto_now_add(model):
+    """Позволяет сохранить даты из файла вместо текущего времени."""
+    fields = [
+        field for field in model._meta.concrete_fields
+        if getattr(field, "auto_now_add", False)
+    ]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
 
 
 class Command(BaseCommand):
@@ -9,6 +120,12 @@ class Command(BaseCommand):
     def add_arguments(self, parser):
         parser.add_argument(
             "directory", type=str, help="Directory containing CSV files")
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help="Number of rows inserted per transaction",
+        )
 
     def handle(self, *args, **kwargs):
         directory = kwargs["directory"]
@@ -17,5 +134,45 @@ class Command(BaseCommand):
                 f'Directory "{directory}" does not exist'))
             return
 
+        loaded_models = []
+        for filename, model, build in CSV_FILES:
+            path = os.path.join(directory, filename)
+            if not os.path.isfile(path):
+                self.stdout.write(self.style.WARNING(
+                    f'Skipping "{filename}": file not found'))
+                continue
+            self.load_file(path, model, build, kwargs["batch_size"])
+            loaded_models.append(model)
+
+        self.reset_sequences(loaded_models)
+        call_command("recount_counters", stdout=self.stdout)
+        # bulk_create не отправляет сигналы, кэш ответов API сбрасывается
+        # здесь.
+        bump_versions(ALL_NAMESPACE)
         self.stdout.write(self.style.SUCCESS(
             f'Successfully loaded data from "{directory}"'))
+
+    def load_file(self, path, model, build, batch_size):
+        started = time.monotonic()
+        total = 0
+        with open(path, encoding="utf-8", newline="") as csv_file:
+            rows = map(build, csv.DictReader(csv_file))
+            with keep_auto_now_add(model):
+                for chunk in chunked(rows, batch_size):
+                    with transaction.atomic():
+                        model.objects.bulk_create(chunk, batch_size=batch_size)
+                    total += len(chunk)
+        elapsed = time.monotonic() - started
+        rate = total / elapsed if elapsed else total
+        self.stdout.write(
+            f"{os.path.basename(path)}: {total} rows "
+            f"in {elapsed:.2f}s ({rate:.0f} rows/s)"
+        )
+
+    def reset_sequences(self, models):
+        statements = connection.ops.sequence_reset_sql(no_style(), models)
+        if not statements:
+            return
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
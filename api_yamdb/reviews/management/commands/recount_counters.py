@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+from api.v1.cache import ALL_NAMESPACE, bump_versions
+from reviews.facets import recount_facets
+from reviews.models import Comment, Review, Title
+
+
+class Command(BaseCommand):
+    help = "Recalculate denormalized counters from the source tables"
+
+    def handle(self, *args, **kwargs):
+        with transaction.atomic():
+            updated = self.recount_ratings()
+            recount_facets()
+            reviews = self.recount_comments()
+            # QuerySet.update() не отправляет сигналы, кэш ответов API
+            # сбрасывается здесь.
+            bump_versions(ALL_NAMESPACE)
+        self.stdout.write(self.style.SUCCESS(
+            f"Recalculated ratings and facets for {updated} titles "
+            f"and comment counts for {reviews} reviews"))
+
+    def recount_ratings(self):
+        reviews = Review.objects.filter(title=OuterRef("pk")).order_by()
+        reviews = reviews.values("title")
+        return Title.objects.update(
+            rating_sum=Coalesce(
+                Subquery(reviews.annotate(total=Sum("score")).values("total")),
+                0,
+            ),
+            rating_count=Coalesce(
+                Subquery(reviews.annotate(total=Count("pk")).values("total")),
+                0,
+            ),
+        )
+
+    def recount_comments(self):
+        comments = Comment.objects.filter(review=OuterRef("pk")).order_by()
+        comments = comments.values("review")
+        return Review.objects.update(
+            comment_count=Coalesce(
+                Subquery(
+                    comments.annotate(total=Count("pk")).values("total")
+                ),
+                0,
+            ),
+        )
@@ -0,0 +1,53 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from reviews.outbox import deliver_emails, get_pending_emails
+
+
+class Command(BaseCommand):
+    help = "Send queued emails from the outbox"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=100,
+            help="Number of emails taken from the outbox at once",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=4,
+            help="Number of threads sending emails in parallel",
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep polling the outbox instead of exiting when it is empty",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=5,
+            help="Seconds between polls in --loop mode",
+        )
+
+    def handle(self, *args, **kwargs):
+        while True:
+            sent, failed = self.drain(kwargs["batch_size"], kwargs["workers"])
+            if sent or failed:
+                self.stdout.write(f"Sent {sent} emails, {failed} failed")
+            if not kwargs["loop"]:
+                break
+            time.sleep(kwargs["interval"])
+
+    def drain(self, batch_size, workers):
+        sent = failed = 0
+        while True:
+            emails = get_pending_emails(batch_size)
+            if not emails:
+                return sent, failed
+            batch_sent = deliver_emails(emails, workers=workers)
+            sent += batch_sent
+            failed += len(emails) - batch_sent
@@ -0,0 +1,88 @@
+# Generated by Django 3.2 on 2026-10-18 05:21
+
+from django.db import migrations, models
+from django.db.models import Count
+import django.db.models.deletion
+
+
+def fill_facet_counts(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    GenreTitle = apps.get_model('reviews', 'GenreTitle')
+    CategoryYearCount = apps.get_model('reviews', 'CategoryYearCount')
+    GenreCategoryYearCount = apps.get_model(
+        'reviews', 'GenreCategoryYearCount'
+    )
+    CategoryYearCount.objects.bulk_create(
+        CategoryYearCount(**row)
+        for row in Title.objects.order_by().values(
+            'category_id', 'year'
+        ).annotate(count=Count('pk'))
+    )
+    GenreCategoryYearCount.objects.bulk_create(
+        GenreCategoryYearCount(
+            genre_id=row['genre_id'],
+            category_id=row['title__category_id'],
+            year=row['title__year'],
+            count=row['count'],
+        )
+        for row in GenreTitle.objects.order_by().values(
+            'genre_id', 'title__category_id', 'title__year'
+        ).annotate(count=Count('pk'))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0008_outgoing_email'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GenreCategoryYearCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.SmallIntegerField(verbose_name='Год релиза')),
+                ('count', models.IntegerField(default=0, verbose_name='Количество произведений')),
+                ('category', models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='reviews.category', verbose_name='Категория')),
+                ('genre', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='reviews.genre', verbose_name='Жанр')),
+            ],
+            options={
+                'verbose_name': 'Счётчик жанра',
+                'verbose_name_plural': 'Счётчики жанров',
+            },
+        ),
+        migrations.CreateModel(
+            name='CategoryYearCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.SmallIntegerField(verbose_name='Год релиза')),
+                ('count', models.IntegerField(default=0, verbose_name='Количество произведений')),
+                ('category', models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='reviews.category', verbose_name='Категория')),
+            ],
+            options={
+                'verbose_name': 'Счётчик категории',
+                'verbose_name_plural': 'Счётчики категорий',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='genrecategoryyearcount',
+            constraint=models.UniqueConstraint(fields=('genre', 'category', 'year'), name='unique_genre_category_year_count'),
+        ),
+        migrations.AddConstraint(
+            model_name='genrecategoryyearcount',
+            constraint=models.UniqueConstraint(condition=models.Q(category__isnull=True), fields=('genre', 'year'), name='unique_genre_no_category_year_count'),
+        ),
+        migrations.AddConstraint(
+            model_name='categoryyearcount',
+            constraint=models.UniqueConstraint(fields=('category', 'year'), name='unique_category_year_count'),
+        ),
+        migrations.AddConstraint(
+            model_name='categoryyearcount',
+            constraint=models.UniqueConstraint(condition=models.Q(category__isnull=True), fields=('year',), name='unique_no_category_year_count'),
+        ),
+        migrations.RunPython(
+            fill_facet_counts,
+            migrations.RunPython.noop,
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 3.2 on 2026-10-18 05:35
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_comment_counts(apps, schema_editor):
+    Comment = apps.get_model('reviews', 'Comment')
+    Review = apps.get_model('reviews', 'Review')
+    comments = Comment.objects.filter(review=OuterRef('pk')).order_by()
+    Review.objects.update(
+        comment_count=Coalesce(
+            Subquery(
+                comments.values('review').annotate(
+                    total=Count('pk')
+                ).values('total')
+            ),
+            0,
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0010_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='review',
+            name='comment_count',
+            field=models.IntegerField(default=0, editable=False, verbose_name='Количество комментариев'),
+        ),
+        migrations.RunPython(
+            fill_comment_counts,
+            migrations.RunPython.noop,
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 3.2 on 2026-10-18 06:09
+
+from django.db import migrations, models
+import reviews.validators
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0013_title_search'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='category',
+            name='slug',
+            field=models.SlugField(unique=True, validators=[reviews.validators.forbidden_slug_validator], verbose_name='Слаг'),
+        ),
+        migrations.AlterField(
+            model_name='genre',
+            name='slug',
+            field=models.SlugField(unique=True, validators=[reviews.validators.forbidden_slug_validator], verbose_name='Слаг'),
+        ),
+    ]
@@ -1,7 +1,8 @@
 from django.contrib.auth.models import AbstractUser
 from django.contrib.auth.validators import UnicodeUsernameValidator
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import models, transaction
+from django.utils import timezone
 
 from reviews.constants import (
     LENGTH_INPUT_FIELD,
@@ -14,7 +15,11 @@ from reviews.constants import (
     MIN_SCORE,
     VALIDATOR_ERROR_MESSAGE,
 )
-from reviews.validators import forbidden_username_validator, validate_year
+from reviews.validators import (
+    forbidden_slug_validator,
+    forbidden_username_validator,
+    validate_year,
+)
 
 
 class User(AbstractUser):
@@ -74,6 +79,32 @@ class User(AbstractUser):
         return self.role == self.Role.MODERATOR
 
 
+class CounterFieldsModel(models.Model):
+    """Модель со счётчиками, которые сигналы сдвигают выражениями F().
+
+    При сохранении существующей записи счётчики не записываются, иначе
+    устаревшее значение в памяти затёрло бы сдвиги из других транзакций.
+    """
+
+    counter_fields = ()
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and not args and kwargs.get(
+            "update_fields"
+        ) is None:
+            skipped = self.get_deferred_fields()
+            kwargs["update_fields"] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.counter_fields
+                and field.attname not in skipped
+            ]
+        super().save(*args, **kwargs)
+
+
 class Genre(models.Model):
     name = models.CharField(
         "Жанр",
@@ -82,12 +113,17 @@ class Genre(models.Model):
     slug = models.SlugField(
         "Слаг",
         unique=True,
+        validators=(forbidden_slug_validator,),
     )
+    updated_at = models.DateTimeField("Дата изменения", auto_now=True)
 
     class Meta:
         verbose_name = "Жанр"
         verbose_name_plural = "Жанры"
         ordering = ("name",)
+        indexes = [
+            models.Index(fields=["name"], name="genre_name_idx"),
+        ]
 
     def __str__(self):
         return f"Жанр: {self.name}"
@@ -101,18 +137,23 @@ class Category(models.Model):
     slug = models.SlugField(
         "Слаг",
         unique=True,
+        validators=(forbidden_slug_validator,),
     )
+    updated_at = models.DateTimeField("Дата изменения", auto_now=True)
 
     class Meta:
         verbose_name = "Категория"
         verbose_name_plural = "Категории"
         ordering = ("name",)
+        indexes = [
+            models.Index(fields=["name"], name="category_name_idx"),
+        ]
 
     def __str__(self):
         return f"Категория: {self.name}"
 
 
-class Title(models.Model):
+class Title(CounterFieldsModel):
     name = models.CharField(
         "Название",
         max_length=LENGTH_INPUT_FIELD,
@@ -127,6 +168,7 @@ class Title(models.Model):
     )
     genre = models.ManyToManyField(
         Genre,
+        through="GenreTitle",
         verbose_name="Жанр",
         blank=True,
     )
@@ -138,17 +180,195 @@ class Title(models.Model):
         null=True,
         blank=True,
     )
+    rating_sum = models.IntegerField(
+        "Сумма оценок",
+        default=0,
+        editable=False,
+    )
+    rating_count = models.IntegerField(
+        "Количество оценок",
+        default=0,
+        editable=False,
+    )
+    updated_at = models.DateTimeField("Дата изменения", auto_now=True)
+
+    counter_fields = ("rating_sum", "rating_count")
 
     class Meta:
         verbose_name = "Произведение"
         verbose_name_plural = "Произведения"
         ordering = ("name",)
+        indexes = [
+            models.Index(fields=["name"], name="title_name_idx"),
+            models.Index(
+                fields=["category", "name"],
+                name="title_category_name_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"Произведение: {self.name}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        loaded = dict(zip(field_names, values))
+        if "category_id" in loaded and "year" in loaded:
+            instance._saved_facet = (loaded["category_id"], loaded["year"])
+        return instance
+
+    def save(self, *args, **kwargs):
+        # Счётчики фасетов обновляются обработчиком post_save в той же
+        # транзакции.
+        with transaction.atomic(using=kwargs.get("using")):
+            super().save(*args, **kwargs)
+
+    @property
+    def rating(self):
+        if not self.rating_count:
+            return None
+        return self.rating_sum // self.rating_count
+
+
+class SearchDocumentField(models.TextField):
+    """Скрытый столбец FTS5-таблицы с её именем, к нему применяется MATCH."""
+
+
+@SearchDocumentField.register_lookup
+class Match(models.Lookup):
+    lookup_name = "match"
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f"{lhs} MATCH {rhs}", (*lhs_params, *rhs_params)
+
+
+class TitleSearch(models.Model):
+    """FTS5-индекс произведений, см. reviews.search.
+
+    Таблицу создаёт install_title_search, поэтому модель неуправляемая.
+    Через неё поиск соединяется с произведениями, и MATCH выполняется один
+    раз на запрос.
+    """
+
+    title = models.OneToOneField(
+        Title,
+        on_delete=models.DO_NOTHING,
+        db_column="rowid",
+        db_constraint=False,
+        primary_key=True,
+        related_name="search_document",
+    )
+    document = SearchDocumentField(db_column="reviews_title_fts")
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = "reviews_title_fts"
+
 
-class Review(models.Model):
+class GenreTitle(models.Model):
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        verbose_name="Произведение",
+    )
+    genre = models.ForeignKey(
+        Genre,
+        on_delete=models.CASCADE,
+        verbose_name="Жанр",
+    )
+
+    class Meta:
+        db_table = "reviews_title_genre"
+        verbose_name = "Жанр произведения"
+        verbose_name_plural = "Жанры произведений"
+        unique_together = ("title", "genre")
+        indexes = [
+            models.Index(
+                fields=["genre", "title"],
+                name="genre_title_genre_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.genre} — {self.title}"
+
+
+class CategoryYearCount(models.Model):
+    """Число произведений категории за год, поддерживается сигналами.
+
+    Ключи хранятся без ограничения внешнего ключа, чтобы удаление жанров и
+    категорий не каскадировалось на счётчики: их переносят обработчики
+    сигналов.
+    """
+
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name="+",
+        verbose_name="Категория",
+        null=True,
+    )
+    year = models.SmallIntegerField("Год релиза")
+    count = models.IntegerField("Количество произведений", default=0)
+
+    class Meta:
+        verbose_name = "Счётчик категории"
+        verbose_name_plural = "Счётчики категорий"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["category", "year"],
+                name="unique_category_year_count",
+            ),
+            models.UniqueConstraint(
+                fields=["year"],
+                condition=models.Q(category__isnull=True),
+                name="unique_no_category_year_count",
+            ),
+        ]
+
+
+class GenreCategoryYearCount(models.Model):
+    """Число произведений жанра в категории за год."""
+
+    genre = models.ForeignKey(
+        Genre,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name="+",
+        verbose_name="Жанр",
+    )
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name="+",
+        verbose_name="Категория",
+        null=True,
+    )
+    year = models.SmallIntegerField("Год релиза")
+    count = models.IntegerField("Количество произведений", default=0)
+
+    class Meta:
+        verbose_name = "Счётчик жанра"
+        verbose_name_plural = "Счётчики жанров"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["genre", "category", "year"],
+                name="unique_genre_category_year_count",
+            ),
+            models.UniqueConstraint(
+                fields=["genre", "year"],
+                condition=models.Q(category__isnull=True),
+                name="unique_genre_no_category_year_count",
+            ),
+        ]
+
+
+class Review(CounterFieldsModel):
     title = models.ForeignKey(
         Title,
         on_delete=models.CASCADE,
@@ -176,11 +396,25 @@ class Review(models.Model):
         ),
     )
     pub_date = models.DateTimeField("Дата публикации", auto_now_add=True)
+    updated_at = models.DateTimeField("Дата изменения", auto_now=True)
+    comment_count = models.IntegerField(
+        "Количество комментариев",
+        default=0,
+        editable=False,
+    )
+
+    counter_fields = ("comment_count",)
 
     class Meta:
         verbose_name = "Отзыв"
         verbose_name_plural = "Отзывы"
-        ordering = ("-pub_date",)
+        ordering = ("-pub_date", "-id")
+        indexes = [
+            models.Index(
+                fields=["title", "-pub_date", "-id"],
+                name="review_title_pub_date_idx",
+            ),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=["title", "author"],
@@ -191,6 +425,21 @@ class Review(models.Model):
     def __str__(self):
         return f"Обзор(id={self.id}, text={self.text[:MAX_LENGTH_TEXT]})"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        loaded = dict(zip(field_names, values))
+        if "title_id" in loaded and "score" in loaded:
+            instance._saved_rating = (loaded["title_id"], loaded["score"])
+        return instance
+
+    def save(self, *args, **kwargs):
+        # Оценка учитывается в рейтинге произведения обработчиком post_save,
+        # поэтому сохранение отзыва и пересчёт рейтинга идут в одной
+        # транзакции.
+        with transaction.atomic(using=kwargs.get("using")):
+            super().save(*args, **kwargs)
+
 
 class Comment(models.Model):
     review = models.ForeignKey(
@@ -207,11 +456,83 @@ class Comment(models.Model):
         verbose_name="Автор комментария",
     )
     pub_date = models.DateTimeField("Дата публикации", auto_now_add=True)
+    updated_at = models.DateTimeField("Дата изменения", auto_now=True)
 
     class Meta:
         verbose_name = "Комментарий"
         verbose_name_plural = "Комментарии"
-        ordering = ("-pub_date",)
+        ordering = ("-pub_date", "-id")
+        indexes = [
+            models.Index(
+                fields=["review", "-pub_date", "-id"],
+                name="comment_review_pub_date_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"Комментарий(id={self.id}, text={self.text[:MAX_LENGTH_TEXT]})"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        loaded = dict(zip(field_names, values))
+        if "review_id" in loaded:
+            instance._saved_review_id = loaded["review_id"]
+        return instance
+
+    def save(self, *args, **kwargs):
+        # Счётчик комментариев отзыва сдвигает обработчик post_save в той
+        # же транзакции.
+        with transaction.atomic(using=kwargs.get("using")):
+            super().save(*args, **kwargs)
+
+
+class OutgoingEmail(models.Model):
+    subject = models.CharField("Тема", max_length=LENGTH_INPUT_FIELD)
+    body = models.TextField("Текст")
+    from_email = models.EmailField("Отправитель")
+    recipient = models.EmailField("Получатель")
+    created_at = models.DateTimeField("Создано", auto_now_add=True)
+    send_after = models.DateTimeField("Отправить после", default=timezone.now)
+    attempts = models.PositiveSmallIntegerField("Попытки", default=0)
+    last_error = models.TextField("Последняя ошибка", blank=True)
+    sent_at = models.DateTimeField("Отправлено", null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Исходящее письмо"
+        verbose_name_plural = "Исходящие письма"
+        ordering = ("send_after",)
+        indexes = [
+            models.Index(
+                fields=["send_after"],
+                condition=models.Q(sent_at__isnull=True),
+                name="outgoing_email_pending_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"Письмо(id={self.id}, to={self.recipient})"
+
+
+class CollectionVersion(models.Model):
+    """Версия коллекции для кэша ответов API и условных запросов.
+
+    Повышается в той же транзакции, что пишет данные коллекции, поэтому
+    все процессы видят новую версию вместе с новыми данными.
+    """
+
+    namespace = models.CharField("Пространство имён", max_length=64)
+    version = models.PositiveBigIntegerField("Версия", default=0)
+    modified_at = models.DateTimeField("Дата изменения", default=timezone.now)
+
+    class Meta:
+        verbose_name = "Версия коллекции"
+        verbose_name_plural = "Версии коллекций"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["namespace"], name="unique_collection_version"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.namespace}.{self.version}"
@@ -0,0 +1,107 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import send_mail
+from django.db import transaction
+from django.utils import timezone
+
+from reviews.models import OutgoingEmail
+
+
+def queue_email(subject, body, recipient):
+    """Сохраняет письмо в очередь в текущей транзакции.
+
+    Письмо отправляет команда send_emails. При EMAIL_OUTBOX_EAGER оно
+    отправляется сразу после фиксации транзакции.
+    """
+    email = OutgoingEmail.objects.create(
+        subject=subject,
+        body=body,
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        recipient=recipient,
+    )
+    if settings.EMAIL_OUTBOX_EAGER:
+        transaction.on_commit(lambda: deliver_emails(claim_emails([email])))
+    return email
+
+
+def send_email(email):
+    try:
+        send_mail(
+            email.subject,
+            email.body,
+            email.from_email,
+            [email.recipient],
+            fail_silently=False,
+        )
+    except Exception as error:
+        return error
+    return None
+
+
+def get_retry_delay(attempts):
+    delay = settings.EMAIL_OUTBOX_RETRY_DELAY * 2 ** (attempts - 1)
+    return timedelta(seconds=min(delay, settings.EMAIL_OUTBOX_MAX_RETRY_DELAY))
+
+
+def deliver_emails(emails, workers=1):
+    """Отправляет письма и записывает результат каждой попытки.
+
+    Отправка выполняется в пуле потоков, а запись в базу — в вызывающем
+    потоке. Неудачные письма откладываются с экспоненциально растущей
+    задержкой. Возвращает количество отправленных писем.
+    """
+    if workers > 1:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            errors = list(executor.map(send_email, emails))
+    else:
+        errors = [send_email(email) for email in emails]
+
+    now = timezone.now()
+    sent = 0
+    for email, error in zip(emails, errors):
+        email.attempts += 1
+        if error is None:
+            email.sent_at = now
+            email.last_error = ""
+            sent += 1
+        else:
+            email.send_after = now + get_retry_delay(email.attempts)
+            email.last_error = f"{type(error).__name__}: {error}"
+    OutgoingEmail.objects.bulk_update(
+        emails, ("attempts", "sent_at", "send_after", "last_error")
+    )
+    return sent
+
+
+def claim_emails(emails):
+    """Забирает письма в отправку, откладывая их на EMAIL_OUTBOX_LEASE.
+
+    Письмо достаётся тому, чей условный UPDATE изменил строку. Остальные
+    отправители не увидят его до конца аренды, а если отправитель упал,
+    письмо будет отправлено после неё. Возвращает забранные письма.
+    """
+    lease_until = timezone.now() + timedelta(
+        seconds=settings.EMAIL_OUTBOX_LEASE
+    )
+    claimed = []
+    for email in emails:
+        if OutgoingEmail.objects.filter(
+            pk=email.pk,
+            sent_at__isnull=True,
+            send_after=email.send_after,
+            attempts=email.attempts,
+        ).update(send_after=lease_until):
+            email.send_after = lease_until
+            claimed.append(email)
+    return claimed
+
+
+def get_pending_emails(limit):
+    """Забирает до limit писем, которые пора отправить."""
+    return claim_emails(OutgoingEmail.objects.filter(
+        sent_at__isnull=True,
+        send_after__lte=timezone.now(),
+        attempts__lt=settings.EMAIL_OUTBOX_MAX_ATTEMPTS,
+    )[:limit])
@@ -0,0 +1,106 @@
+from django.db import OperationalError, connections
+from django.db.models import Q
+
+from reviews.models import Title, TitleSearch
+
+TITLE_TABLE = Title._meta.db_table
+FTS_TABLE = TitleSearch._meta.db_table
+
+FTS_TABLE_SQL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    f"name, description, content='{TITLE_TABLE}', content_rowid='id')"
+)
+FTS_TRIGGERS_SQL = {
+    f"{FTS_TABLE}_insert": (
+        f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_insert "
+        f"AFTER INSERT ON {TITLE_TABLE} BEGIN "
+        f"INSERT INTO {FTS_TABLE}(rowid, name, description) "
+        f"VALUES (new.id, new.name, new.description); END"
+    ),
+    f"{FTS_TABLE}_delete": (
+        f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_delete "
+        f"AFTER DELETE ON {TITLE_TABLE} BEGIN "
+        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description) "
+        f"VALUES ('delete', old.id, old.name, old.description); END"
+    ),
+    f"{FTS_TABLE}_update": (
+        f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_update "
+        f"AFTER UPDATE OF name, description ON {TITLE_TABLE} BEGIN "
+        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description) "
+        f"VALUES ('delete', old.id, old.name, old.description); "
+        f"INSERT INTO {FTS_TABLE}(rowid, name, description) "
+        f"VALUES (new.id, new.name, new.description); END"
+    ),
+}
+
+
+def install_title_search(using="default"):
+    """Создаёт FTS5-индекс произведений и триггеры его синхронизации.
+
+    При перестройке таблицы миграциями SQLite удаляет её триггеры, поэтому
+    функция вызывается после каждого migrate: недостающие объекты
+    создаются заново, а индекс перестраивается по текущим данным.
+    Для других СУБД и сборок SQLite без FTS5 ничего не делает.
+    """
+    connection = connections[using]
+    if connection.vendor != "sqlite":
+        return False
+    names = (FTS_TABLE, *FTS_TRIGGERS_SQL)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE name IN (%s)"
+            % ", ".join(["%s"] * len(names)),
+            names,
+        )
+        existing = {row[0] for row in cursor.fetchall()}
+        if existing == set(names):
+            return True
+        try:
+            cursor.execute(FTS_TABLE_SQL)
+        except OperationalError:
+            return False
+        for sql in FTS_TRIGGERS_SQL.values():
+            cursor.execute(sql)
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"
+        )
+    return True
+
+
+def has_title_search(using="default"):
+    connection = connections[using]
+    if connection.vendor != "sqlite":
+        return False
+    if not hasattr(connection, "has_title_search"):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = %s", (FTS_TABLE,)
+            )
+            connection.has_title_search = cursor.fetchone() is not None
+    return connection.has_title_search
+
+
+def build_match_query(text):
+    """Превращает пользовательский ввод в запрос FTS5 по префиксам слов."""
+    terms = text.split()
+    return " ".join('"%s"*' % term.replace('"', '""') for term in terms)
+
+
+def search_titles(queryset, text):
+    """Отбирает произведения по тексту в названии или описании.
+
+    С FTS5 результаты упорядочены по релевантности (bm25), иначе
+    используется поиск подстроки в названии и описании. Индекс
+    присоединяется к произведениям, поэтому MATCH выполняется один раз, а
+    не для каждой найденной строки.
+    """
+    match = build_match_query(text)
+    if not match:
+        return queryset
+    if not has_title_search(queryset.db):
+        return queryset.filter(
+            Q(name__icontains=text) | Q(description__icontains=text)
+        )
+    return queryset.filter(search_document__document__match=match).order_by(
+        "search_document__rank", "name"
+    )
@@ -0,0 +1,175 @@
+from collections import Counter
+
+from django.db.models import Count, F, Sum
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_migrate,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+
+from reviews import facets
+from reviews.deletion import DeleteBatch, objects_deleted
+from reviews.models import (
+    Category,
+    Comment,
+    Genre,
+    GenreTitle,
+    Review,
+    Title,
+)
+from reviews.search import install_title_search
+
+
+def shift_title_rating(title_id, score, count):
+    """Сдвигает сохранённые сумму и число оценок произведения."""
+    Title.objects.filter(pk=title_id).update(
+        rating_sum=F("rating_sum") + score,
+        rating_count=F("rating_count") + count,
+    )
+
+
+def recount_title_rating(title_id):
+    """Пересчитывает рейтинг одного произведения по его отзывам."""
+    totals = Review.objects.filter(title_id=title_id).aggregate(
+        rating_sum=Sum("score"),
+        rating_count=Count("pk"),
+    )
+    Title.objects.filter(pk=title_id).update(
+        rating_sum=totals["rating_sum"] or 0,
+        rating_count=totals["rating_count"],
+    )
+
+
+@receiver(post_save, sender=Review)
+def update_rating_on_review_save(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+    current = (instance.title_id, instance.score)
+    saved = getattr(instance, "_saved_rating", None)
+    if created:
+        shift_title_rating(instance.title_id, instance.score, 1)
+    elif saved is None:
+        recount_title_rating(instance.title_id)
+    elif saved != current:
+        saved_title_id, saved_score = saved
+        shift_title_rating(saved_title_id, -saved_score, -1)
+        shift_title_rating(instance.title_id, instance.score, 1)
+    instance._saved_rating = current
+
+
+def shift_comment_count(review_id, count):
+    """Сдвигает сохранённое число комментариев отзыва."""
+    Review.objects.filter(pk=review_id).update(
+        comment_count=F("comment_count") + count,
+    )
+
+
+@receiver(post_save, sender=Comment)
+def update_comment_count_on_save(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+    saved = getattr(instance, "_saved_review_id", None)
+    if created:
+        shift_comment_count(instance.review_id, 1)
+    elif saved is not None and saved != instance.review_id:
+        shift_comment_count(saved, -1)
+        shift_comment_count(instance.review_id, 1)
+    instance._saved_review_id = instance.review_id
+
+
+@receiver(objects_deleted, sender=DeleteBatch)
+def update_counters_on_delete(sender, batch, **kwargs):
+    # Счётчики удаляемых вместе с отзывами и произведениями строк не
+    # сдвигаются: каждому оставшемуся родителю хватает одного UPDATE.
+    titles = batch.get(Title)
+    reviews = batch.get(Review)
+    ratings = {}
+    for review in reviews.values():
+        if review.title_id not in titles:
+            score, count = ratings.get(review.title_id, (0, 0))
+            ratings[review.title_id] = (score + review.score, count + 1)
+    for title_id, (score, count) in ratings.items():
+        shift_title_rating(title_id, -score, -count)
+
+    comment_counts = Counter(
+        comment.review_id
+        for comment in batch.get(Comment).values()
+        if comment.review_id not in reviews
+    )
+    for review_id, count in comment_counts.items():
+        shift_comment_count(review_id, -count)
+
+
+@receiver(pre_save, sender=Title)
+def remember_title_facet(sender, instance, raw, **kwargs):
+    if raw or instance._state.adding or hasattr(instance, "_saved_facet"):
+        return
+    instance._saved_facet = Title.objects.filter(pk=instance.pk).values_list(
+        "category_id", "year"
+    ).first()
+
+
+@receiver(post_save, sender=Title)
+def update_facets_on_title_save(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+    current = (instance.category_id, instance.year)
+    saved = getattr(instance, "_saved_facet", None)
+    if created:
+        # Жанры добавляются позже и учитываются по m2m_changed.
+        facets.shift_title(*current, (), 1)
+    elif saved is not None and saved != current:
+        genre_ids = list(GenreTitle.objects.filter(
+            title=instance
+        ).values_list("genre_id", flat=True))
+        facets.shift_title(*saved, genre_ids, -1)
+        facets.shift_title(*current, genre_ids, 1)
+    instance._saved_facet = current
+
+
+@receiver(pre_delete, sender=Title)
+def update_facets_on_title_delete(sender, instance, **kwargs):
+    saved = getattr(
+        instance, "_saved_facet", (instance.category_id, instance.year)
+    )
+    genre_ids = GenreTitle.objects.filter(title=instance).values_list(
+        "genre_id", flat=True
+    )
+    facets.shift_title(*saved, list(genre_ids), -1)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def update_facets_on_genre_change(sender, instance, action, reverse, pk_set,
+                                  **kwargs):
+    deltas = {"post_add": 1, "pre_remove": -1, "pre_clear": -1}
+    if action not in deltas:
+        return
+    if reverse:
+        links = GenreTitle.objects.filter(genre=instance)
+        if pk_set is not None:
+            links = links.filter(title_id__in=pk_set)
+    else:
+        links = GenreTitle.objects.filter(title=instance)
+        if pk_set is not None:
+            links = links.filter(genre_id__in=pk_set)
+    facets.shift_genre_links(facets.get_genre_links(links), deltas[action])
+
+
+@receiver(post_delete, sender=Genre)
+def delete_genre_facets(sender, instance, **kwargs):
+    facets.GenreCategoryYearCount.objects.filter(genre_id=instance.pk).delete()
+
+
+@receiver(pre_delete, sender=Category)
+def move_category_facets(sender, instance, **kwargs):
+    facets.move_category_to_none(instance.pk)
+
+
+@receiver(post_migrate)
+def install_search_index(sender, using, **kwargs):
+    if sender.name == "reviews":
+        install_title_search(using)
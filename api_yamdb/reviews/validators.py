@@ -1,7 +1,7 @@
 from django.utils import timezone
 from rest_framework.exceptions import ValidationError
 
-from reviews.constants import FORBIDDEN_USERNAMES
+from reviews.constants import FORBIDDEN_SLUGS, FORBIDDEN_USERNAMES
 
 
 def forbidden_username_validator(username):
@@ -9,6 +9,11 @@ def forbidden_username_validator(username):
         raise ValidationError(f"Username '{username}' is not allowed.")
 
 
+def forbidden_slug_validator(slug):
+    if slug in FORBIDDEN_SLUGS:
+        raise ValidationError(f"Слаг «{slug}» зарезервирован.")
+
+
 def validate_year(value):
     current_year = timezone.now().year
     if value > current_year:
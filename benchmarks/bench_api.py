@@ -0,0 +1,367 @@
+"""Бенчмарк эндпоинтов API v1 на синтетических данных.
+
+Пример:
+    python benchmarks/bench_api.py --titles 100000 --reviews 5000000 \\
+        --comments 20000000 --db /tmp/bench.sqlite3 --output run.json
+    python benchmarks/bench_api.py --db /tmp/bench.sqlite3 --skip-seed \\
+        --output new.json --compare run.json
+"""
+import argparse
+import csv
+import math
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from common import setup_django, migrate, summarize, write_results
+
+CSV_HEADERS = {
+    "users.csv": (
+        "id", "username", "email", "role", "bio", "first_name", "last_name"
+    ),
+    "category.csv": ("id", "name", "slug"),
+    "genre.csv": ("id", "name", "slug"),
+    "titles.csv": ("id", "name", "year", "category"),
+    "genre_title.csv": ("id", "title_id", "genre_id"),
+    "review.csv": ("id", "title_id", "text", "author", "score", "pub_date"),
+    "comments.csv": ("id", "review_id", "text", "author", "pub_date"),
+}
+# Маршруты, которые нельзя многократно вызывать без изменения данных.
+SKIPPED_ROUTES = {
+    "categories-detail": "only DELETE is routed",
+    "genres-detail": "only DELETE is routed",
+}
+START_DATE = datetime(2020, 1, 1, tzinfo=timezone.utc)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--titles", type=int, default=1000)
+    parser.add_argument("--reviews", type=int, default=10000)
+    parser.add_argument("--comments", type=int, default=20000)
+    parser.add_argument("--genres", type=int, default=20)
+    parser.add_argument("--categories", type=int, default=5)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument(
+        "--db", default=":memory:", help="SQLite file for the dataset"
+    )
+    parser.add_argument(
+        "--skip-seed",
+        action="store_true",
+        help="Reuse the dataset already stored in --db",
+    )
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument(
+        "--with-cache",
+        action="store_true",
+        help="Keep the response cache enabled",
+    )
+    parser.add_argument("--output", help="JSON file for the results")
+    parser.add_argument("--compare", help="Previous results to compare with")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="Allowed relative p95 growth before a route is a regression",
+    )
+    return parser.parse_args()
+
+
+def write_csv(directory, filename, rows):
+    with open(Path(directory) / filename, "w", encoding="utf-8",
+              newline="") as csv_file:
+        writer = csv.writer(csv_file)
+        writer.writerow(CSV_HEADERS[filename])
+        writer.writerows(rows)
+
+
+def generate_dataset(directory, args):
+    """Пишет CSV в формате static/data, не держа строки в памяти."""
+    rng = random.Random(0)
+    # У пользователя может быть только один отзыв на произведение.
+    users = max(args.users, math.ceil(args.reviews / max(args.titles, 1)))
+    roles = ("admin", "moderator") + ("user",) * 8
+    write_csv(directory, "users.csv", (
+        (i, f"user{i}", f"user{i}@yamdb.fake", roles[i % len(roles)],
+         "", "", "")
+        for i in range(1, users + 1)
+    ))
+    write_csv(directory, "category.csv", (
+        (i, f"Категория {i}", f"category-{i}")
+        for i in range(1, args.categories + 1)
+    ))
+    write_csv(directory, "genre.csv", (
+        (i, f"Жанр {i}", f"genre-{i}") for i in range(1, args.genres + 1)
+    ))
+    write_csv(directory, "titles.csv", (
+        (i, f"Произведение {i}", 1900 + i % 120, i % args.categories + 1)
+        for i in range(1, args.titles + 1)
+    ))
+
+    def genre_title_rows():
+        link_id = 0
+        for title_id in range(1, args.titles + 1):
+            genres = rng.sample(
+                range(1, args.genres + 1), min(3, args.genres)
+            )
+            for genre_id in genres[:rng.randint(1, len(genres))]:
+                link_id += 1
+                yield link_id, title_id, genre_id
+
+    write_csv(directory, "genre_title.csv", genre_title_rows())
+    write_csv(directory, "review.csv", (
+        (i, (i - 1) % args.titles + 1, f"Отзыв {i}",
+         (i - 1) // args.titles + 1, rng.randint(1, 10),
+         (START_DATE + timedelta(seconds=i)).isoformat())
+        for i in range(1, args.reviews + 1)
+    ))
+    write_csv(directory, "comments.csv", (
+        (i, (i - 1) % args.reviews + 1, f"Комментарий {i}",
+         rng.randint(1, users),
+         (START_DATE + timedelta(seconds=i)).isoformat())
+        for i in range(1, args.comments + 1)
+    ))
+
+
+def seed(args):
+    from django.core.management import call_command
+
+    with tempfile.TemporaryDirectory() as directory:
+        started = time.monotonic()
+        generate_dataset(directory, args)
+        print(f"Generated CSV in {time.monotonic() - started:.1f}s",
+              file=sys.stderr)
+        call_command(
+            "load_data", directory,
+            batch_size=args.batch_size, stdout=sys.stderr,
+        )
+
+
+def get_routes():
+    from rest_framework.test import APIClient
+
+    from api.v1.authentication import UserClaimsAccessToken
+    from reviews.models import Category, Comment, Genre, Review, Title, User
+
+    admin = User.objects.filter(role=User.Role.ADMIN).first()
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f"Bearer {UserClaimsAccessToken.for_user(admin)}"
+    )
+    anonymous = APIClient()
+    title = Title.objects.select_related("category").order_by("pk").first()
+    review = Review.objects.filter(title=title).order_by("pk").first()
+    comment = Comment.objects.filter(review=review).order_by("pk").first()
+    title_filters = {
+        "genre": title.genre.first().slug,
+        "category": title.category.slug,
+    }
+    titles_url = "/api/v1/titles/"
+    reviews_url = f"{titles_url}{title.pk}/reviews/"
+    comments_url = f"{reviews_url}{review.pk}/comments/"
+    signup_counter = iter(range(10 ** 9))
+    bulk_counter = iter(range(10 ** 9))
+
+    def signup():
+        number = next(signup_counter)
+        return anonymous.post("/api/v1/auth/signup/", {
+            "username": f"bench{number}",
+            "email": f"bench{number}@yamdb.fake",
+        })
+
+    def get_token():
+        from django.contrib.auth.tokens import default_token_generator
+        return anonymous.post("/api/v1/auth/token/", {
+            "username": admin.username,
+            "confirmation_code": default_token_generator.make_token(admin),
+        })
+
+    def upsert(url, model):
+        names = model.objects.order_by("pk").values_list("slug", "name")
+        names = list(names[:10])
+
+        def request():
+            # Имена меняются через раз, чтобы каждый вызов обновлял объекты.
+            suffix = " *" if next(bulk_counter) % 2 else ""
+            return client.post(url, [
+                {"name": f"{name}{suffix}", "slug": slug}
+                for slug, name in names
+            ], format="json")
+
+        return request
+
+    def create_titles():
+        number = next(bulk_counter)
+        return client.post(f"{titles_url}bulk/", [
+            {
+                "name": f"Пакет {number}.{i}",
+                "year": title.year,
+                "genre": [title_filters["genre"]],
+                "category": title_filters["category"],
+            }
+            for i in range(10)
+        ], format="json")
+
+    return {
+        "api-root": lambda: anonymous.get("/api/v1/"),
+        "signup": signup,
+        "get_token": get_token,
+        "user-list": lambda: client.get("/api/v1/users/"),
+        "user-detail": lambda: client.get(f"/api/v1/users/{admin.username}/"),
+        "user-me": lambda: client.get("/api/v1/users/me/"),
+        "categories-list": lambda: anonymous.get("/api/v1/categories/"),
+        "genres-list": lambda: anonymous.get("/api/v1/genres/"),
+        "titles-list": lambda: anonymous.get(titles_url),
+        "titles-list-filtered": lambda: anonymous.get(
+            titles_url, title_filters
+        ),
+        # Совпадает со всеми произведениями набора данных.
+        "titles-search": lambda: anonymous.get(
+            titles_url, {"search": "Произведение"}
+        ),
+        "titles-detail": lambda: anonymous.get(f"{titles_url}{title.pk}/"),
+        "titles-facets": lambda: anonymous.get(
+            f"{titles_url}facets/", {"category": title.category.slug}
+        ),
+        "review-list": lambda: anonymous.get(reviews_url),
+        "review-detail": lambda: anonymous.get(
+            f"{reviews_url}{review.pk}/"
+        ),
+        "comment-list": lambda: anonymous.get(comments_url),
+        "comment-detail": lambda: anonymous.get(
+            f"{comments_url}{comment.pk}/"
+        ),
+        "export": lambda: client.get("/api/v1/export/titles.csv"),
+        # Пакетная загрузка добавляет произведения, поэтому замеряется
+        # последней.
+        "categories-bulk": upsert("/api/v1/categories/bulk/", Category),
+        "genres-bulk": upsert("/api/v1/genres/bulk/", Genre),
+        "titles-bulk": create_titles,
+    }
+
+
+def check_coverage(routes):
+    """Предупреждает о маршрутах api/v1/urls.py без замеров."""
+    from django.urls import URLPattern, URLResolver
+
+    from api.v1 import urls
+
+    def names(patterns):
+        for pattern in patterns:
+            if isinstance(pattern, URLResolver):
+                yield from names(pattern.url_patterns)
+            elif isinstance(pattern, URLPattern) and pattern.name:
+                yield pattern.name
+
+    missing = set(names(urls.urlpatterns)) - set(routes) - set(SKIPPED_ROUTES)
+    for name in sorted(missing):
+        print(f"Warning: route {name} is not benchmarked", file=sys.stderr)
+
+
+def fetch(request):
+    """Выполняет запрос и дочитывает тело потокового ответа."""
+    response = request()
+    if response.streaming:
+        return response, b"".join(response.streaming_content)
+    return response, response.content
+
+
+def measure(request, runs, warmup):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    for _ in range(warmup):
+        fetch(request)
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        response, content = fetch(request)
+        samples.append(time.perf_counter() - started)
+
+    with CaptureQueriesContext(connection) as context:
+        tracemalloc.start()
+        fetch(request)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    result = summarize(samples)
+    result.update({
+        "status": response.status_code,
+        "queries": len(context.captured_queries),
+        "peak_alloc_kb": peak / 1024,
+        "response_kb": len(content) / 1024,
+    })
+    return result
+
+
+def compare(results, previous_path, threshold):
+    import json
+
+    with open(previous_path, encoding="utf-8") as previous_file:
+        previous = json.load(previous_file)["routes"]
+    regressions = []
+    for name, current in results["routes"].items():
+        before = previous.get(name)
+        if before is None:
+            continue
+        change = current["p95_ms"] / before["p95_ms"] - 1
+        queries = current["queries"] - before["queries"]
+        print(
+            f"{name:24} p95 {before['p95_ms']:8.2f} -> "
+            f"{current['p95_ms']:8.2f} ms ({change:+.0%}), "
+            f"queries {queries:+d}",
+            file=sys.stderr,
+        )
+        if change > threshold or queries > 0:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    args = parse_args()
+    overrides = {} if args.with_cache else {"API_CACHE_TIMEOUT": 0}
+    setup_django(args.db, **overrides)
+    migrate()
+    if not args.skip_seed:
+        seed(args)
+
+    import django
+    from reviews.models import Comment, Review, Title
+
+    routes = get_routes()
+    check_coverage(routes)
+    results = {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "titles": Title.objects.count(),
+            "reviews": Review.objects.count(),
+            "comments": Comment.objects.count(),
+            "requests": args.requests,
+            "cache": args.with_cache,
+        },
+        "routes": {},
+    }
+    for name, request in routes.items():
+        results["routes"][name] = measure(request, args.requests, args.warmup)
+        print(f"{name}: p95 {results['routes'][name]['p95_ms']:.2f} ms",
+              file=sys.stderr)
+    write_results(results, args.output)
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.threshold)
+        if regressions:
+            print(f"Regressions: {', '.join(regressions)}", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
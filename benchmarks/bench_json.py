@@ -0,0 +1,113 @@
+"""Сравнение JSONRenderer/JSONParser DRF с версиями на orjson.
+
+Данные — вывод TitleReadSerializer для страницы произведений.
+
+Пример:
+    python benchmarks/bench_json.py --titles 1000 --output json.json
+"""
+import argparse
+import sys
+import time
+from io import BytesIO
+
+from common import setup_django, migrate, summarize, write_results
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--titles", type=int, default=500)
+    parser.add_argument("--genres", type=int, default=3)
+    parser.add_argument("--runs", type=int, default=200)
+    parser.add_argument("--output", help="JSON file for the results")
+    return parser.parse_args()
+
+
+def get_payload(args):
+    from api.v1.serializers import TitleReadSerializer
+    from reviews.models import Category, Genre, GenreTitle, Title
+
+    category = Category.objects.create(name="Категория", slug="category")
+    Genre.objects.bulk_create(
+        Genre(name=f"Жанр {i}", slug=f"genre-{i}")
+        for i in range(args.genres)
+    )
+    # На SQLite bulk_create не возвращает первичные ключи.
+    genres = list(Genre.objects.all())
+    Title.objects.bulk_create(
+        Title(
+            name=f"Произведение {i}",
+            year=1900 + i % 120,
+            category=category,
+            description="Описание произведения " * 5,
+        )
+        for i in range(args.titles)
+    )
+    GenreTitle.objects.bulk_create(
+        GenreTitle(title=title, genre=genre)
+        for title in Title.objects.all()
+        for genre in genres
+    )
+    titles = Title.objects.select_related("category").prefetch_related(
+        "genre"
+    )
+    return {
+        "count": args.titles,
+        "next": None,
+        "previous": None,
+        "results": TitleReadSerializer(titles, many=True).data,
+    }
+
+
+def measure(function, runs):
+    function()
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        function()
+        samples.append(time.perf_counter() - started)
+    return summarize(samples)
+
+
+def main():
+    args = parse_args()
+    setup_django()
+    migrate()
+
+    from rest_framework.parsers import JSONParser
+    from rest_framework.renderers import JSONRenderer
+
+    from api.v1.parsers import ORJSONParser
+    from api.v1.renderers import ORJSONRenderer, orjson
+
+    if orjson is None:
+        print("Warning: orjson is not installed, measuring the fallback",
+              file=sys.stderr)
+    payload = get_payload(args)
+    body = JSONRenderer().render(payload)
+    if ORJSONRenderer().render(payload) != body:
+        sys.exit("ORJSONRenderer output differs from JSONRenderer")
+
+    cases = {
+        "render-drf": lambda: JSONRenderer().render(payload),
+        "render-orjson": lambda: ORJSONRenderer().render(payload),
+        "parse-drf": lambda: JSONParser().parse(BytesIO(body)),
+        "parse-orjson": lambda: ORJSONParser().parse(BytesIO(body)),
+    }
+    results = {
+        "meta": {
+            "titles": args.titles,
+            "genres": args.genres,
+            "body_kb": len(body) / 1024,
+            "orjson": orjson.__version__ if orjson else None,
+        },
+        "cases": {},
+    }
+    for name, function in cases.items():
+        results["cases"][name] = measure(function, args.runs)
+        print(f"{name}: p50 {results['cases'][name]['p50_ms']:.3f} ms",
+              file=sys.stderr)
+    write_results(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Сравнение стандартной цепочки middleware с цепочкой без сессий для API.
+
+Пример:
+    python benchmarks/bench_middleware.py --requests 2000 --output mw.json
+"""
+import argparse
+import sys
+import time
+
+from common import setup_django, migrate, summarize, write_results
+
+STOCK_MIDDLEWARE = {
+    "api.middleware.SessionMiddleware":
+        "django.contrib.sessions.middleware.SessionMiddleware",
+    "api.middleware.CsrfViewMiddleware":
+        "django.middleware.csrf.CsrfViewMiddleware",
+    "api.middleware.AuthenticationMiddleware":
+        "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "api.middleware.MessageMiddleware":
+        "django.contrib.messages.middleware.MessageMiddleware",
+}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--url", default="/api/v1/categories/")
+    parser.add_argument("--output", help="JSON file for the results")
+    return parser.parse_args()
+
+
+def measure(middleware, url, runs):
+    from django.conf import settings
+    from django.test import Client
+
+    settings.MIDDLEWARE = middleware
+    # Новый клиент собирает цепочку middleware заново.
+    client = Client()
+    for _ in range(10):
+        client.get(url)
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        client.get(url)
+        samples.append(time.perf_counter() - started)
+    return summarize(samples)
+
+
+def main():
+    args = parse_args()
+    # Без кэша ответов, чтобы запрос проходил всю цепочку до представления.
+    setup_django(API_CACHE_TIMEOUT=0)
+    migrate()
+
+    from django.conf import settings
+
+    api_middleware = list(settings.MIDDLEWARE)
+    stock_middleware = [STOCK_MIDDLEWARE.get(path, path)
+                        for path in api_middleware]
+    results = {"meta": {"url": args.url}, "cases": {}}
+    for name, middleware in (
+        ("stock", stock_middleware), ("api", api_middleware),
+    ):
+        results["cases"][name] = measure(middleware, args.url, args.requests)
+        print(f"{name}: p50 {results['cases'][name]['p50_ms']:.3f} ms",
+              file=sys.stderr)
+    stock, api = results["cases"]["stock"], results["cases"]["api"]
+    results["saving_p50_ms"] = stock["p50_ms"] - api["p50_ms"]
+    print(f"Saving per request: {results['saving_p50_ms']:.3f} ms (p50)",
+          file=sys.stderr)
+    write_results(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Сравнение ListSerializer DRF со списками из compile_serializer.
+
+Пример:
+    python benchmarks/bench_serializers.py --items 1000 --output ser.json
+"""
+import argparse
+import sys
+import time
+
+from common import setup_django, migrate, summarize, write_results
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=500)
+    parser.add_argument("--runs", type=int, default=100)
+    parser.add_argument("--output", help="JSON file for the results")
+    return parser.parse_args()
+
+
+def seed(items):
+    from reviews.models import (
+        Category, Comment, Genre, GenreTitle, Review, Title, User,
+    )
+
+    category = Category.objects.create(name="Категория", slug="category")
+    Genre.objects.bulk_create(
+        Genre(name=f"Жанр {i}", slug=f"genre-{i}") for i in range(3)
+    )
+    Title.objects.bulk_create(
+        Title(name=f"Произведение {i}", year=2000, category=category,
+              description="Описание")
+        for i in range(items)
+    )
+    User.objects.bulk_create(
+        User(username=f"user{i}", email=f"user{i}@yamdb.fake")
+        for i in range(items)
+    )
+    # На SQLite bulk_create не возвращает первичные ключи.
+    GenreTitle.objects.bulk_create(
+        GenreTitle(title=title, genre=genre)
+        for title in Title.objects.all()
+        for genre in Genre.objects.all()
+    )
+    title = Title.objects.first()
+    Review.objects.bulk_create(
+        Review(title=title, author=author, text="Отзыв", score=5)
+        for author in User.objects.all()
+    )
+    review = Review.objects.first()
+    Comment.objects.bulk_create(
+        Comment(review=review, author=author, text="Комментарий")
+        for author in User.objects.all()
+    )
+
+
+def measure(function, runs):
+    function()
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        function()
+        samples.append(time.perf_counter() - started)
+    return summarize(samples)
+
+
+def main():
+    args = parse_args()
+    setup_django()
+    migrate()
+    seed(args.items)
+
+    from rest_framework.renderers import JSONRenderer
+    from rest_framework.serializers import ListSerializer
+
+    from api.v1.serializers import (
+        CommentSerializer, ReviewSerializer, TitleReadSerializer,
+    )
+    from reviews.models import Comment, Review, Title
+
+    # Объекты загружаются один раз, замеряется только сериализация.
+    datasets = {
+        "titles": (TitleReadSerializer, list(
+            Title.objects.select_related("category").prefetch_related("genre")
+        )),
+        "reviews": (ReviewSerializer, list(
+            Review.objects.select_related("author")
+        )),
+        "comments": (CommentSerializer, list(
+            Comment.objects.select_related("author")
+        )),
+    }
+    results = {"meta": {"items": args.items}, "cases": {}}
+    for name, (serializer_class, objects) in datasets.items():
+        def drf():
+            return ListSerializer(objects, child=serializer_class()).data
+
+        def compiled():
+            return serializer_class(objects, many=True).data
+
+        renderer = JSONRenderer()
+        if renderer.render(drf()) != renderer.render(compiled()):
+            sys.exit(f"{name}: compiled output differs from DRF")
+        for variant, function in (("drf", drf), ("compiled", compiled)):
+            case = f"{name}-{variant}"
+            results["cases"][case] = measure(function, args.runs)
+            print(f"{case}: p50 {results['cases'][case]['p50_ms']:.3f} ms",
+                  file=sys.stderr)
+    write_results(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
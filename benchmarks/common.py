@@ -0,0 +1,66 @@
+import json
+import os
+import statistics
+import sys
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+PROJECT_DIR = ROOT_DIR / "api_yamdb"
+
+
+def setup_django(db_name=":memory:", **overrides):
+    """Настраивает Django для бенчмарка на отдельной базе SQLite.
+
+    overrides заменяют значения настроек проекта, например
+    API_CACHE_TIMEOUT=0, чтобы измерять работу без кэша ответов.
+    """
+    sys.path.insert(0, str(PROJECT_DIR))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "api_yamdb.settings")
+
+    import django
+    from django.conf import settings
+    from django.db import connections
+
+    django.setup()
+    settings.ALLOWED_HOSTS = ["*"]
+    settings.DEBUG = False
+    settings.EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
+    settings.EMAIL_OUTBOX_EAGER = False
+    for name, value in overrides.items():
+        setattr(settings, name, value)
+    connections["default"].settings_dict["NAME"] = str(db_name)
+
+
+def migrate():
+    from django.core.management import call_command
+
+    call_command("migrate", verbosity=0, interactive=False)
+
+
+def percentile(values, percent):
+    """Процентиль по методу ближайшего ранга."""
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    rank = max(1, round(percent / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def summarize(samples):
+    """Сводит замеры времени (в секундах) к миллисекундам."""
+    return {
+        "runs": len(samples),
+        "mean_ms": statistics.fmean(samples) * 1000,
+        "p50_ms": percentile(samples, 50) * 1000,
+        "p95_ms": percentile(samples, 95) * 1000,
+        "p99_ms": percentile(samples, 99) * 1000,
+    }
+
+
+def write_results(results, path):
+    if path is None:
+        json.dump(results, sys.stdout, indent=2, ensure_ascii=False)
+        sys.stdout.write("\n")
+        return
+    with open(path, "w", encoding="utf-8") as output:
+        json.dump(results, output, indent=2, ensure_ascii=False)
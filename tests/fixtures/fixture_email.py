@@ -0,0 +1,10 @@
+import pytest
+
+# Тесты, которые ждут письмо в mail.outbox сразу после запроса.
+EAGER_EMAIL_MODULES = ('tests.test_00_user_registration',)
+
+
+@pytest.fixture(autouse=True)
+def eager_email_outbox(request, settings):
+    if request.module.__name__ in EAGER_EMAIL_MODULES:
+        settings.EMAIL_OUTBOX_EAGER = True
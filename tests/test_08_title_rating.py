@@ -0,0 +1,70 @@
+import pytest
+from django.core.management import call_command
+
+from reviews.models import Title
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08TitleRating:
+
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    REVIEW_DETAIL_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/'
+    )
+
+    def get_title(self, title_id):
+        return Title.objects.get(pk=title_id)
+
+    def test_01_rating_follows_reviews(self, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        create_single_review(admin_client, title_id, 'Отзыв', 3)
+        review = create_single_review(
+            user_client, title_id, 'Ещё отзыв', 8
+        ).json()
+
+        title = self.get_title(title_id)
+        assert (title.rating_sum, title.rating_count) == (11, 2), (
+            'Проверьте, что при создании отзыва обновляются сумма и '
+            'количество оценок произведения.'
+        )
+        response = admin_client.get(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title_id)
+        )
+        assert response.json()['rating'] == 5, (
+            'Проверьте, что рейтинг произведения вычисляется из '
+            'сохранённых суммы и количества оценок.'
+        )
+
+        review_url = self.REVIEW_DETAIL_URL_TEMPLATE.format(
+            title_id=title_id, review_id=review['id']
+        )
+        user_client.patch(review_url, data={'score': 10})
+        title = self.get_title(title_id)
+        assert (title.rating_sum, title.rating_count) == (13, 2), (
+            'Проверьте, что при изменении оценки обновляется сумма '
+            'оценок произведения.'
+        )
+
+        user_client.delete(review_url)
+        title = self.get_title(title_id)
+        assert (title.rating_sum, title.rating_count) == (3, 1), (
+            'Проверьте, что при удалении отзыва его оценка исключается '
+            'из рейтинга произведения.'
+        )
+
+    def test_02_recount_counters(self, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        create_single_review(admin_client, title_id, 'Отзыв', 7)
+        Title.objects.update(rating_sum=0, rating_count=0)
+
+        call_command('recount_counters')
+
+        title = self.get_title(title_id)
+        assert (title.rating_sum, title.rating_count) == (7, 1), (
+            'Проверьте, что команда `recount_counters` восстанавливает '
+            'рейтинг произведений по отзывам.'
+        )
+        assert self.get_title(titles[1]['id']).rating is None
@@ -0,0 +1,171 @@
+import pytest
+from django.db import IntegrityError
+from rest_framework.test import APIClient
+
+from api.v1.authentication import UserClaimsAccessToken
+from reviews.models import Category, Comment, Genre, Review, Title, User
+
+
+def create_catalog(titles_count):
+    categories = [
+        Category.objects.create(name=f'Категория {i}', slug=f'category-{i}')
+        for i in range(3)
+    ]
+    genres = [
+        Genre.objects.create(name=f'Жанр {i}', slug=f'genre-{i}')
+        for i in range(3)
+    ]
+    for i in range(titles_count):
+        title = Title.objects.create(
+            name=f'Произведение {i}',
+            year=2000,
+            category=categories[i % len(categories)],
+        )
+        title.genre.set(genres[:i % len(genres) + 1])
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09QueryCount:
+
+    TITLES_URL = '/api/v1/titles/'
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    COMMENTS_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+    )
+
+    @pytest.mark.parametrize('limit', (1, 5, 20))
+    def test_01_title_list(self, client, django_assert_num_queries, limit):
+        create_catalog(20)
+        # Здесь и ниже 1 — чтение версий коллекций для кэша ответов.
+        with django_assert_num_queries(1 + 3):
+            response = client.get(self.TITLES_URL, {'limit': limit})
+        assert len(response.json()['results']) == limit, (
+            f'Проверьте, что GET-запрос к `{self.TITLES_URL}` возвращает '
+            'запрошенное количество произведений.'
+        )
+
+    def test_02_title_detail(self, client, django_assert_num_queries):
+        create_catalog(1)
+        title = Title.objects.get()
+        with django_assert_num_queries(1 + 2):
+            client.get(self.TITLE_DETAIL_URL_TEMPLATE.format(
+                title_id=title.id
+            ))
+
+    def test_03_review_create(self, django_assert_num_queries, user):
+        create_catalog(1)
+        title = Title.objects.get()
+        client = APIClient()
+        token = UserClaimsAccessToken.for_user(user)
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=title.id)
+        # Состояние пользователя, произведение, BEGIN, INSERT и пересчёт
+        # рейтинга; без отдельной проверки на повторный отзыв. Ещё три
+        # запроса повышают версии коллекций и создают версию отзывов
+        # к произведению.
+        with django_assert_num_queries(5 + 3):
+            response = client.post(url, data={'text': 'Отзыв', 'score': 5})
+        assert response.status_code == 201
+
+        response = client.post(url, data={'text': 'Отзыв', 'score': 5})
+        assert response.status_code == 400, (
+            'Проверьте, что повторный отзыв на произведение возвращает '
+            'ответ со статусом 400.'
+        )
+        assert response.json() == {
+            'non_field_errors': ['Отзыв уже существует']
+        }
+
+    @pytest.mark.parametrize('limit', (1, 5, 20))
+    def test_04_review_list(self, client, django_assert_num_queries, limit):
+        create_catalog(1)
+        title = Title.objects.get()
+        for i in range(20):
+            author = User.objects.create_user(
+                username=f'author{i}', email=f'author{i}@yamdb.fake'
+            )
+            Review.objects.create(
+                title=title, author=author, text=f'Отзыв {i}', score=5
+            )
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=title.id)
+        with django_assert_num_queries(1 + 2):
+            response = client.get(url, {'limit': limit})
+        results = response.json()['results']
+        assert len(results) == limit
+        assert all(review['author'] for review in results)
+
+    @pytest.mark.parametrize('limit', (1, 5, 20))
+    def test_05_comment_list(self, client, django_assert_num_queries, user,
+                             limit):
+        create_catalog(1)
+        title = Title.objects.get()
+        review = Review.objects.create(
+            title=title, author=user, text='Отзыв', score=5
+        )
+        for i in range(20):
+            Comment.objects.create(
+                review=review, author=user, text=f'Комментарий {i}'
+            )
+        url = self.COMMENTS_URL_TEMPLATE.format(
+            title_id=title.id, review_id=review.id
+        )
+        with django_assert_num_queries(1 + 2):
+            response = client.get(url, {'limit': limit})
+        assert len(response.json()['results']) == limit
+
+    def test_06_comment_list_not_found(self, client, user):
+        create_catalog(2)
+        first, second = Title.objects.order_by('id')
+        review = Review.objects.create(
+            title=first, author=user, text='Отзыв', score=5
+        )
+        url = self.COMMENTS_URL_TEMPLATE.format(
+            title_id=first.id, review_id=review.id
+        )
+        response = client.get(url)
+        assert response.status_code == 200
+        assert response.json()['results'] == []
+
+        url = self.COMMENTS_URL_TEMPLATE.format(
+            title_id=second.id, review_id=review.id
+        )
+        assert client.get(url).status_code == 404, (
+            'Проверьте, что список комментариев к отзыву другого '
+            'произведения возвращает ответ со статусом 404.'
+        )
+
+    def test_07_review_create_other_integrity_error(self, user,
+                                                    monkeypatch):
+        create_catalog(1)
+        title = Title.objects.get()
+        client = APIClient()
+        token = UserClaimsAccessToken.for_user(user)
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+        def save(*args, **kwargs):
+            raise IntegrityError('FOREIGN KEY constraint failed')
+
+        monkeypatch.setattr(Review, 'save', save)
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=title.id)
+        with pytest.raises(IntegrityError):
+            client.post(url, data={'text': 'Отзыв', 'score': 5})
+
+    @pytest.mark.parametrize('comments_count', (1, 5, 20))
+    def test_08_title_delete(self, django_assert_num_queries, user,
+                             comments_count):
+        create_catalog(1)
+        title = Title.objects.get()
+        review = Review.objects.create(
+            title=title, author=user, text='Отзыв', score=5
+        )
+        Comment.objects.bulk_create(
+            Comment(review=review, author=user, text=f'Комментарий {i}')
+            for i in range(comments_count)
+        )
+        # Сбор каскада, BEGIN, жанры и два сдвига фасетов, четыре DELETE.
+        # Счётчики удаляемых отзыва и произведения не сдвигаются, а три
+        # запроса один раз повышают версии и создают недостающие.
+        with django_assert_num_queries(2 + 4 + 4 + 3):
+            title.delete()
+        assert not Comment.objects.exists()
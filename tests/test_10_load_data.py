@@ -0,0 +1,35 @@
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+
+from reviews.models import Comment, Genre, Review, Title, User
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10LoadData:
+
+    DATA_DIR = settings.BASE_DIR / 'static' / 'data'
+
+    def test_01_load_data(self):
+        call_command('load_data', str(self.DATA_DIR), batch_size=10)
+
+        assert User.objects.count() == 5
+        assert Genre.objects.count() == 15
+        assert Title.objects.count() == 32
+        assert Title.genre.through.objects.count() == 42
+        assert Review.objects.count() == 72
+        assert Comment.objects.count() == 3
+
+        review = Review.objects.get(pk=1)
+        assert review.pub_date.year == 2019, (
+            'Проверьте, что команда `load_data` сохраняет дату публикации '
+            'из файла, а не текущее время.'
+        )
+        title = Title.objects.get(pk=1)
+        assert title.rating_count == title.reviews.count(), (
+            'Проверьте, что после загрузки данных пересчитываются счётчики '
+            'рейтинга произведений.'
+        )
+
+        user = User.objects.create(username='new_user', email='new@yamdb.fake')
+        assert user.pk > 104
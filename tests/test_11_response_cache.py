@@ -0,0 +1,73 @@
+import pytest
+from django.core.management import call_command
+
+from reviews.models import Genre, Review, Title
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11ResponseCache:
+
+    GENRES_URL = '/api/v1/genres/'
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+
+    def test_01_repeated_get_is_cached(self, client,
+                                       django_assert_num_queries):
+        Genre.objects.create(name='Драма', slug='drama')
+        client.get(self.GENRES_URL)
+        # Из базы читаются только версии коллекций.
+        with django_assert_num_queries(1):
+            response = client.get(self.GENRES_URL)
+        assert response.json()['count'] == 1
+
+    def test_02_query_string_is_part_of_key(self, client):
+        Genre.objects.create(name='Драма', slug='drama')
+        Genre.objects.create(name='Комедия', slug='comedy')
+        client.get(self.GENRES_URL)
+        response = client.get(self.GENRES_URL, {'search': 'Драма'})
+        assert response.json()['count'] == 1, (
+            'Проверьте, что параметры запроса входят в ключ кэша.'
+        )
+
+    def test_03_model_changes_invalidate(self, client, admin_client):
+        client.get(self.GENRES_URL)
+        Genre.objects.create(name='Драма', slug='drama')
+        response = client.get(self.GENRES_URL)
+        assert response.json()['count'] == 1, (
+            'Проверьте, что создание жанра сбрасывает закэшированный '
+            f'ответ `{self.GENRES_URL}`.'
+        )
+
+        titles, _, _ = create_titles(admin_client)
+        title_url = self.TITLE_DETAIL_URL_TEMPLATE.format(
+            title_id=titles[0]['id']
+        )
+        reviews_url = self.REVIEWS_URL_TEMPLATE.format(
+            title_id=titles[0]['id']
+        )
+        client.get(title_url)
+        client.get(reviews_url)
+        create_single_review(admin_client, titles[0]['id'], 'Отзыв', 6)
+        assert client.get(title_url).json()['rating'] == 6
+        assert client.get(reviews_url).json()['count'] == 1
+
+        Review.objects.all().delete()
+        assert client.get(title_url).json()['rating'] is None
+        assert client.get(reviews_url).json()['count'] == 0
+
+    def test_04_commands_invalidate(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        title_url = self.TITLE_DETAIL_URL_TEMPLATE.format(
+            title_id=titles[0]['id']
+        )
+        create_single_review(admin_client, titles[0]['id'], 'Отзыв', 6)
+        assert client.get(title_url).json()['rating'] == 6
+
+        Review.objects.update(score=8)
+        Title.objects.update(rating_sum=0, rating_count=0)
+        call_command('recount_counters')
+        assert client.get(title_url).json()['rating'] == 8, (
+            'Проверьте, что команда `recount_counters` сбрасывает '
+            'закэшированные ответы.'
+        )
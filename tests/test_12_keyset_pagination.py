@@ -0,0 +1,60 @@
+import pytest
+
+from reviews.models import Comment, Review, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12KeysetPagination:
+
+    COMMENTS_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+    )
+
+    @pytest.fixture
+    def comments_url(self, user):
+        title = Title.objects.create(name='Произведение', year=2000)
+        review = Review.objects.create(
+            title=title, author=user, text='Отзыв', score=5
+        )
+        for i in range(5):
+            Comment.objects.create(review=review, author=user, text=str(i))
+        return self.COMMENTS_URL_TEMPLATE.format(
+            title_id=title.id, review_id=review.id
+        )
+
+    def test_01_cursor_walk(self, client, comments_url):
+        expected_ids = list(
+            Comment.objects.order_by('-pub_date', '-id')
+            .values_list('id', flat=True)
+        )
+        response = client.get(comments_url, {'cursor': '', 'limit': 2})
+        data = response.json()
+        assert 'count' not in data, (
+            'Проверьте, что в режиме курсора не выполняется подсчёт '
+            'общего количества объектов.'
+        )
+        assert data['previous'] is None
+
+        pages = [data]
+        while data['next']:
+            data = client.get(data['next']).json()
+            pages.append(data)
+        ids = [item['id'] for page in pages for item in page['results']]
+        assert ids == expected_ids, (
+            'Проверьте, что переход по ссылкам `next` возвращает все '
+            'объекты по одному разу в порядке убывания даты публикации.'
+        )
+
+        previous_page = client.get(pages[-1]['previous']).json()
+        assert previous_page['results'] == pages[-2]['results'], (
+            'Проверьте, что ссылка `previous` возвращает предыдущую страницу.'
+        )
+
+    def test_02_limit_offset_still_works(self, client, comments_url):
+        data = client.get(comments_url, {'limit': 2, 'offset': 2}).json()
+        assert data['count'] == 5
+        assert len(data['results']) == 2
+
+    def test_03_invalid_cursor(self, client, comments_url):
+        response = client.get(comments_url, {'cursor': 'broken'})
+        assert response.status_code == 404
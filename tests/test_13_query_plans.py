@@ -0,0 +1,66 @@
+import re
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category, Comment, Genre, Review, Title
+
+FULL_SCAN = re.compile(r'\bSCAN (\w+)$')
+
+
+def explain(sql, params):
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13QueryPlans:
+
+    @pytest.fixture
+    def catalog(self, user):
+        category = Category.objects.create(name='Фильм', slug='movie')
+        genre = Genre.objects.create(name='Драма', slug='drama')
+        title = Title.objects.create(
+            name='Произведение', year=2000, category=category
+        )
+        title.genre.set([genre])
+        review = Review.objects.create(
+            title=title, author=user, text='Отзыв', score=5
+        )
+        Comment.objects.create(review=review, author=user, text='Коммент')
+        return title, review
+
+    def get_urls(self, title, review):
+        reviews_url = f'/api/v1/titles/{title.id}/reviews/'
+        return (
+            '/api/v1/titles/',
+            '/api/v1/titles/?category=movie',
+            '/api/v1/titles/?genre=drama',
+            '/api/v1/titles/?genre=drama&category=movie',
+            f'/api/v1/titles/{title.id}/',
+            '/api/v1/genres/',
+            '/api/v1/categories/',
+            reviews_url,
+            f'{reviews_url}?cursor=',
+            f'{reviews_url}{review.id}/',
+            f'{reviews_url}{review.id}/comments/',
+            f'{reviews_url}{review.id}/comments/?cursor=',
+        )
+
+    def test_01_endpoints_use_indexes(self, client, catalog):
+        connection.ensure_connection()
+        for url in self.get_urls(*catalog):
+            with CaptureQueriesContext(connection) as context:
+                response = client.get(url)
+            assert response.status_code == 200, url
+            for query in context.captured_queries:
+                sql = query['sql']
+                if not sql.startswith('SELECT'):
+                    continue
+                for step in explain(sql, ()):
+                    assert not FULL_SCAN.search(step), (
+                        f'Запрос к `{url}` выполняет полный просмотр '
+                        f'таблицы: {step}\n{sql}'
+                    )
@@ -0,0 +1,86 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14TitleSearch:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    @pytest.fixture
+    def titles(self):
+        return [
+            Title.objects.create(
+                name='Крестный отец', year=1972,
+                description='Семейная сага о мафии.'
+            ),
+            Title.objects.create(
+                name='Побег из Шоушенка', year=1994,
+                description='Тюремная драма, которую снял не крестный отец.'
+            ),
+            Title.objects.create(
+                name='Крестный отец 2', year=1974,
+                description='Продолжение истории: крестный отец в молодости.'
+            ),
+        ]
+
+    def search(self, client, text):
+        response = client.get(self.TITLES_URL, {'search': text})
+        assert response.status_code == 200
+        return [title['id'] for title in response.json()['results']]
+
+    def test_01_search_by_name_and_description(self, client, titles):
+        found = self.search(client, 'КРЕСТН ОТЕЦ')
+        assert set(found) == {title.id for title in titles}, (
+            'Проверьте, что параметр `search` ищет слова по префиксу в '
+            'названии и описании произведения без учёта регистра.'
+        )
+        assert found[-1] == titles[1].id, (
+            'Проверьте, что результаты поиска упорядочены по релевантности.'
+        )
+        assert self.search(client, 'мафии') == [titles[0].id]
+        assert self.search(client, '"') == []
+
+    def test_02_index_follows_changes(self, client, titles):
+        titles[0].name = 'Другое название'
+        titles[0].description = ''
+        titles[0].save()
+        titles[1].delete()
+        Title.objects.create(name='Мафия', year=2000)
+        assert self.search(client, 'крестный') == [titles[2].id]
+        assert len(self.search(client, 'мафия')) == 1
+
+    def test_03_fallback(self, client, titles, monkeypatch):
+        monkeypatch.setattr(
+            'reviews.search.has_title_search', lambda using: False
+        )
+        found = self.search(client, 'мафии')
+        assert found == [titles[0].id], (
+            'Проверьте, что без FTS5 поиск выполняется по подстроке.'
+        )
+
+    def test_04_many_matches(self, client):
+        Title.objects.bulk_create(
+            Title(name=f'Общее название {number}', year=2000)
+            for number in range(3000)
+        )
+        best = Title.objects.create(
+            name='Общее', year=2000, description='Общее общее общее.'
+        )
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(self.TITLES_URL, {'search': 'общее'})
+        assert response.status_code == 200
+        data = response.json()
+        assert data['count'] == 3001
+        assert data['results'][0]['id'] == best.id
+        matches = [
+            query['sql'] for query in context.captured_queries
+            if 'MATCH' in query['sql']
+        ]
+        assert all(sql.count('MATCH') == 1 for sql in matches), (
+            'Проверьте, что полнотекстовый поиск выполняется одним MATCH '
+            f'на запрос, а не для каждой найденной строки: {matches}'
+        )
@@ -0,0 +1,93 @@
+import pytest
+from django.core import mail
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.management import call_command
+
+from reviews.models import OutgoingEmail
+from reviews.outbox import claim_emails, get_pending_emails
+
+
+class FailingEmailBackend(BaseEmailBackend):
+    def send_messages(self, email_messages):
+        raise ConnectionError('SMTP недоступен')
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15EmailOutbox:
+
+    URL_SIGNUP = '/api/v1/auth/signup/'
+    SIGNUP_DATA = {'email': 'valid@yamdb.fake', 'username': 'valid_user'}
+
+    @pytest.fixture(autouse=True)
+    def outbox_settings(self, settings):
+        settings.EMAIL_OUTBOX_EAGER = False
+        settings.EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+        return settings
+
+    def test_01_signup_queues_email(self, client):
+        outbox_before_count = len(mail.outbox)
+        response = client.post(self.URL_SIGNUP, data=self.SIGNUP_DATA)
+        assert response.status_code == 200
+        assert len(mail.outbox) == outbox_before_count, (
+            'Проверьте, что при регистрации письмо не отправляется в '
+            'обработчике запроса, а ставится в очередь.'
+        )
+        email = OutgoingEmail.objects.get()
+        assert email.recipient == self.SIGNUP_DATA['email']
+        assert email.sent_at is None
+
+        call_command('send_emails', workers=2)
+
+        assert len(mail.outbox) == outbox_before_count + 1
+        assert self.SIGNUP_DATA['email'] in mail.outbox[-1].to
+        email.refresh_from_db()
+        assert email.sent_at is not None
+        assert email.attempts == 1
+
+    def test_02_failed_delivery_is_retried(self, client, outbox_settings):
+        outbox_settings.EMAIL_BACKEND = (
+            'tests.test_15_email_outbox.FailingEmailBackend'
+        )
+        client.post(self.URL_SIGNUP, data=self.SIGNUP_DATA)
+
+        call_command('send_emails')
+
+        email = OutgoingEmail.objects.get()
+        assert email.sent_at is None
+        assert email.attempts == 1
+        assert 'SMTP недоступен' in email.last_error
+        assert email.send_after > email.created_at, (
+            'Проверьте, что неудачная отправка откладывается на время '
+            'повторной попытки.'
+        )
+
+        outbox_settings.EMAIL_BACKEND = (
+            'django.core.mail.backends.locmem.EmailBackend'
+        )
+        OutgoingEmail.objects.update(send_after=email.created_at)
+        call_command('send_emails')
+        email.refresh_from_db()
+        assert email.sent_at is not None
+        assert email.attempts == 2
+
+    def test_03_email_is_claimed_once(self, client, outbox_settings):
+        client.post(self.URL_SIGNUP, data=self.SIGNUP_DATA)
+        # Оба отправителя прочитали письмо до того, как его забрали.
+        first = list(OutgoingEmail.objects.all())
+        second = list(OutgoingEmail.objects.all())
+        assert len(claim_emails(first)) == 1
+        assert claim_emails(second) == [], (
+            'Проверьте, что одно письмо не забирают в отправку два '
+            'отправителя.'
+        )
+        assert get_pending_emails(10) == []
+
+    def test_04_eager_delivery_skips_claimed(self, client):
+        client.post(self.URL_SIGNUP, data=self.SIGNUP_DATA)
+        # Так письмо видит обработчик on_commit при EMAIL_OUTBOX_EAGER.
+        email = OutgoingEmail.objects.get()
+        assert len(get_pending_emails(10)) == 1
+        assert claim_emails([email]) == [], (
+            'Проверьте, что письмо, забранное send_emails, не отправляется '
+            'повторно после фиксации транзакции.'
+        )
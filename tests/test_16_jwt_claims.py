@@ -0,0 +1,82 @@
+import pytest
+from django.contrib.auth.tokens import default_token_generator
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.v1.authentication import UserClaimsAccessToken
+from reviews.models import Title
+
+
+def make_client(user):
+    client = APIClient()
+    token = UserClaimsAccessToken.for_user(user)
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    return client
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16JWTClaims:
+
+    URL_TOKEN = '/api/v1/auth/token/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    ME_URL = '/api/v1/users/me/'
+
+    def test_01_token_contains_claims(self, client, user):
+        response = client.post(self.URL_TOKEN, data={
+            'username': user.username,
+            'confirmation_code': default_token_generator.make_token(user),
+        })
+        token = AccessToken(response.json()['token'])
+        assert token['username'] == user.username
+        assert token['role'] == user.role
+        assert token['is_superuser'] is False
+
+    def test_02_no_user_query(self, user):
+        title = Title.objects.create(name='Произведение', year=2000)
+        client = make_client(user)
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=title.id)
+        client.get(url)
+
+        with CaptureQueriesContext(connection) as context:
+            response = client.post(url, data={'text': 'Отзыв', 'score': 5})
+        assert response.status_code == 201
+        assert response.json()['author'] == user.username
+        user_queries = [
+            query['sql'] for query in context.captured_queries
+            if '"reviews_user"' in query['sql']
+        ]
+        assert not user_queries, (
+            'Проверьте, что пользователь из токена не читается из базы '
+            f'на каждый запрос: {user_queries}'
+        )
+
+        response = client.get(self.ME_URL)
+        assert response.json()['email'] == user.email
+
+    def test_03_username_change_keeps_token(self, user):
+        client = make_client(user)
+        response = client.patch(self.ME_URL, data={'username': 'renamed'})
+        assert response.status_code == 200
+        response = client.get(self.ME_URL)
+        assert response.status_code == 200, (
+            'Проверьте, что после смены имени пользователя токен '
+            'остаётся действительным.'
+        )
+        assert response.json()['username'] == 'renamed'
+
+    def test_04_changed_user_is_rejected(self, user):
+        client = make_client(user)
+        assert client.get(self.ME_URL).status_code == 200
+
+        user.role = 'moderator'
+        user.save()
+        assert client.get(self.ME_URL).status_code == 401, (
+            'Проверьте, что после смены роли старый токен не принимается.'
+        )
+
+        client = make_client(user)
+        user.is_active = False
+        user.save()
+        assert client.get(self.ME_URL).status_code == 401
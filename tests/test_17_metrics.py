@@ -0,0 +1,68 @@
+import re
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api import metrics
+from reviews.models import Title
+
+
+def get_timings(response):
+    return dict(
+        re.match(r'\s*(\w+);dur=([\d.]+)', part).groups()
+        for part in response['Server-Timing'].split(',')
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17Metrics:
+
+    TITLES_URL = '/api/v1/titles/'
+    METRICS_URL = '/metrics'
+
+    def test_01_server_timing(self, client):
+        Title.objects.create(name='Произведение', year=2000)
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(self.TITLES_URL)
+        assert response.status_code == 200
+        timings = get_timings(response)
+        assert set(timings) == {'db', 'serialize', 'render', 'total'}
+        assert float(timings['total']) >= float(timings['db'])
+        queries = len(context.captured_queries)
+        assert f'desc="{queries} queries"' in response['Server-Timing'], (
+            'Проверьте, что в Server-Timing указано число SQL-запросов'
+        )
+
+    def test_02_metrics_endpoint(self, client):
+        before = metrics.DB_QUERIES.series['titles-list']['count']
+        client.get(self.TITLES_URL)
+        assert metrics.DB_QUERIES.series['titles-list']['count'] == before + 1
+
+        response = client.get(self.METRICS_URL)
+        assert response.status_code == 200
+        assert response['Content-Type'].startswith('text/plain')
+        body = response.content.decode()
+        for name in (
+            'api_request_duration_seconds',
+            'api_db_duration_seconds',
+            'api_serialize_duration_seconds',
+            'api_render_duration_seconds',
+            'api_db_queries',
+            'api_response_size_bytes',
+        ):
+            assert f'# TYPE {name} histogram' in body
+            assert f'{name}_count{{route="titles-list"}}' in body
+        assert 'api_requests_total{route="titles-list",status="200"}' in body
+
+    def test_03_histogram(self):
+        histogram = metrics.Histogram('test_seconds', 'Test.', (1, 5))
+        histogram.observe('route', 0.5)
+        histogram.observe('route', 3)
+        histogram.observe('route', 10)
+        lines = histogram.collect()
+        assert 'test_seconds_bucket{route="route",le="1"} 1' in lines
+        assert 'test_seconds_bucket{route="route",le="5"} 2' in lines
+        assert 'test_seconds_bucket{route="route",le="+Inf"} 3' in lines
+        assert 'test_seconds_sum{route="route"} 13.5' in lines
+        assert 'test_seconds_count{route="route"} 3' in lines
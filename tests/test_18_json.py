@@ -0,0 +1,80 @@
+import json
+from io import BytesIO
+
+import pytest
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from api.v1 import renderers
+from api.v1.parsers import ORJSONParser
+from api.v1.renderers import ORJSONRenderer
+from reviews.models import Category, Genre, Title
+
+DATA = {
+    'name': 'Произведение\u2028с\u2029разделителями',
+    'year': 2000,
+    'score': 7.5,
+    'genre': [{'name': 'Жанр', 'slug': 'genre'}],
+    'rating': None,
+    1: True,
+}
+
+
+class Test18JSON:
+
+    def test_01_render_parity(self):
+        expected = JSONRenderer().render(DATA)
+        assert ORJSONRenderer().render(DATA) == expected, (
+            'Проверьте, что ORJSONRenderer отдаёт те же байты, что и '
+            'JSONRenderer.'
+        )
+        assert b'\\u2028' in expected
+        assert ORJSONRenderer().render(None) == b''
+
+    def test_02_render_indent(self):
+        expected = JSONRenderer().render(
+            DATA, 'application/json; indent=4'
+        )
+        rendered = ORJSONRenderer().render(DATA, 'application/json; indent=4')
+        assert rendered == expected
+
+    def test_03_fallback(self, monkeypatch):
+        monkeypatch.setattr(renderers, 'orjson', None)
+        assert ORJSONRenderer().render(DATA) == JSONRenderer().render(DATA)
+
+    def test_04_parse(self):
+        body = json.dumps({'text': 'Отзыв', 'score': 5}).encode()
+        assert ORJSONParser().parse(BytesIO(body)) == JSONParser().parse(
+            BytesIO(body)
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_title_list(self, client, admin_client):
+        category = Category.objects.create(name='Категория', slug='category')
+        genre = Genre.objects.create(name='Жанр', slug='genre')
+        title = Title.objects.create(
+            name='Произведение', year=2000, category=category
+        )
+        title.genre.set([genre])
+
+        response = client.get('/api/v1/titles/')
+        assert response.content == JSONRenderer().render(response.data)
+
+        response = admin_client.post(
+            '/api/v1/titles/',
+            data=json.dumps({
+                'name': 'Новое',
+                'year': 2001,
+                'genre': ['genre'],
+                'category': 'category',
+            }),
+            content_type='application/json',
+        )
+        assert response.status_code == 201
+        response = admin_client.post(
+            '/api/v1/titles/',
+            data=b'{"name": ',
+            content_type='application/json',
+        )
+        assert response.status_code == 400
+        assert response.json()['detail'].startswith('JSON parse error')
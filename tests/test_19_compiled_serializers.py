@@ -0,0 +1,82 @@
+import pytest
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+
+from api.v1.serializers import (
+    CommentSerializer,
+    ReviewSerializer,
+    TitleReadSerializer,
+    compile_serializer,
+)
+from reviews.models import Category, Comment, Genre, Review, Title
+
+
+def render_both(serializer_class, queryset):
+    compiled = serializer_class(queryset, many=True).data
+    default = serializers.ListSerializer(
+        queryset, child=serializer_class()
+    ).data
+    return (
+        JSONRenderer().render(compiled),
+        JSONRenderer().render(default),
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19CompiledSerializers:
+
+    @pytest.mark.parametrize('serializer_class', (
+        TitleReadSerializer, ReviewSerializer, CommentSerializer,
+    ))
+    def test_01_compiled(self, serializer_class):
+        assert compile_serializer(serializer_class()) is not None, (
+            f'Проверьте, что все поля {serializer_class.__name__} '
+            'поддерживаются быстрым путём.'
+        )
+
+    def test_02_output_parity(self, user, admin):
+        category = Category.objects.create(name='Категория', slug='category')
+        genres = [
+            Genre.objects.create(name=f'Жанр {i}', slug=f'genre-{i}')
+            for i in range(2)
+        ]
+        first = Title.objects.create(
+            name='Произведение', year=2000, category=category,
+            description='Описание',
+        )
+        first.genre.set(genres)
+        Title.objects.create(name='Без категории', year=2001)
+        review = Review.objects.create(
+            title=first, author=user, text='Отзыв', score=7
+        )
+        Review.objects.create(title=first, author=admin, text='Ещё', score=2)
+        Comment.objects.create(review=review, author=admin, text='Коммент')
+
+        titles = Title.objects.select_related('category').prefetch_related(
+            'genre'
+        ).order_by('id')
+        compiled, default = render_both(TitleReadSerializer, titles)
+        assert compiled == default
+        assert b'"rating":4' in compiled and b'"rating":null' in compiled
+        assert b'"category":null' in compiled
+
+        reviews = Review.objects.select_related('author')
+        compiled, default = render_both(ReviewSerializer, reviews)
+        assert compiled == default
+        comments = Comment.objects.select_related('author')
+        compiled, default = render_both(CommentSerializer, comments)
+        assert compiled == default
+        assert b'"pub_date":"' in compiled
+
+    def test_03_fallback(self):
+        class MethodSerializer(serializers.ModelSerializer):
+            text = serializers.SerializerMethodField()
+
+            class Meta:
+                model = Comment
+                fields = ('id', 'text')
+
+            def get_text(self, obj):
+                return obj.text
+
+        assert compile_serializer(MethodSerializer()) is None
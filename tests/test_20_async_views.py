@@ -0,0 +1,65 @@
+import asyncio
+import threading
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+from rest_framework.test import APIRequestFactory
+
+from api.v1.asynchronous import async_view
+from api.v1.views import TitleViewSet
+from reviews.models import Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20AsyncViews:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def test_01_disabled_by_default(self):
+        view = TitleViewSet.as_view({'get': 'list'})
+        assert not asyncio.iscoroutinefunction(view)
+
+    def test_02_read_in_pool(self, settings):
+        settings.API_ASYNC_VIEWS = True
+        threads = {}
+
+        def view(request):
+            threads[request.method] = threading.get_ident()
+            return request.method
+
+        wrapped = async_view(view)
+        assert asyncio.iscoroutinefunction(wrapped)
+        factory = APIRequestFactory()
+        assert async_to_sync(wrapped)(factory.get('/')) == 'GET'
+        assert async_to_sync(wrapped)(factory.post('/')) == 'POST'
+        assert threads['GET'] != threading.get_ident(), (
+            'Проверьте, что чтение выполняется в пуле потоков.'
+        )
+        assert threads['POST'] == threading.get_ident()
+
+    def test_03_async_viewset(self, settings):
+        settings.API_ASYNC_VIEWS = True
+        Title.objects.create(name='Произведение', year=2000)
+        view = TitleViewSet.as_view({'get': 'list'})
+        assert asyncio.iscoroutinefunction(view)
+        assert view.cls is TitleViewSet
+
+        response = async_to_sync(view)(
+            APIRequestFactory().get(self.TITLES_URL)
+        )
+        response.render()
+        assert response.status_code == 200
+        assert response.data['results'][0]['name'] == 'Произведение'
+
+    def test_04_asgi_metrics(self):
+        Title.objects.create(name='Произведение', year=2000)
+
+        async def get():
+            return await AsyncClient().get(self.TITLES_URL)
+
+        response = async_to_sync(get)()
+        assert response.status_code == 200
+        assert 'desc="0 queries"' not in response['Server-Timing'], (
+            'Проверьте, что под ASGI запросы к базе попадают в метрики.'
+        )
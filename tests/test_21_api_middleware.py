@@ -0,0 +1,35 @@
+import pytest
+from django.core import checks
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21APIMiddleware:
+
+    CATEGORIES_URL = '/api/v1/categories/'
+    ADMIN_LOGIN_URL = '/admin/login/'
+
+    def test_01_api_skips_session(self, client):
+        response = client.get(self.CATEGORIES_URL)
+        assert response.status_code == 200
+        request = response.wsgi_request
+        for attribute in ('session', '_messages'):
+            assert not hasattr(request, attribute), (
+                f'Проверьте, что запросы к API не проходят через middleware, '
+                f'которое задаёт request.{attribute}.'
+            )
+        assert 'Cookie' not in response.get('Vary', '')
+
+    def test_02_admin_keeps_session(self, client):
+        response = client.get(self.ADMIN_LOGIN_URL)
+        assert response.status_code == 200
+        request = response.wsgi_request
+        assert hasattr(request, 'session')
+        assert hasattr(request, 'user')
+        assert 'csrftoken' in response.cookies
+
+    def test_03_admin_checks(self):
+        errors = [
+            message for message in checks.run_checks()
+            if message.is_serious()
+        ]
+        assert not errors
@@ -0,0 +1,70 @@
+import importlib
+
+import pytest
+from django.db import connections
+
+from api_yamdb import settings as project_settings
+
+
+def load_settings(monkeypatch, **environ):
+    for name, value in environ.items():
+        monkeypatch.setenv(name, value)
+    return importlib.reload(project_settings)
+
+
+class Test22DatabaseProfiles:
+
+    @pytest.fixture(autouse=True)
+    def restore_settings(self, monkeypatch):
+        yield
+        monkeypatch.undo()
+        importlib.reload(project_settings)
+
+    def test_01_default_profile(self, monkeypatch):
+        monkeypatch.delenv('DB_PROFILE', raising=False)
+        loaded = load_settings(monkeypatch)
+        assert loaded.DATABASES['default']['ENGINE'] == (
+            'django.db.backends.sqlite3'
+        )
+        assert loaded.SQLITE_PRAGMAS == {}
+
+    def test_02_sqlite_production(self, monkeypatch):
+        loaded = load_settings(monkeypatch, DB_PROFILE='sqlite-production')
+        database = loaded.DATABASES['default']
+        assert database['CONN_MAX_AGE'] > 0
+        assert database['OPTIONS']['timeout'] > 0
+        assert loaded.SQLITE_PRAGMAS['journal_mode'] == 'WAL'
+        assert loaded.SQLITE_PRAGMAS['synchronous'] == 'NORMAL'
+
+    def test_03_postgresql(self, monkeypatch):
+        loaded = load_settings(
+            monkeypatch,
+            DB_PROFILE='postgresql',
+            DB_HOST='db',
+            DB_PGBOUNCER='true',
+            DB_CONN_MAX_AGE='0',
+        )
+        database = loaded.DATABASES['default']
+        assert database['ENGINE'] == 'django.db.backends.postgresql'
+        assert database['HOST'] == 'db'
+        assert database['CONN_MAX_AGE'] == 0
+        assert database['DISABLE_SERVER_SIDE_CURSORS'] is True
+
+    @pytest.mark.django_db
+    def test_04_pragmas_on_connect(self, settings):
+        settings.SQLITE_PRAGMAS = {
+            'synchronous': 'NORMAL',
+            'cache_size': -2048,
+        }
+        connection = connections.create_connection('default')
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('PRAGMA synchronous')
+                assert cursor.fetchone()[0] == 1, (
+                    'Проверьте, что PRAGMA из SQLITE_PRAGMAS применяются '
+                    'к новому соединению.'
+                )
+                cursor.execute('PRAGMA cache_size')
+                assert cursor.fetchone()[0] == -2048
+        finally:
+            connection.close()
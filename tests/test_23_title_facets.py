@@ -0,0 +1,119 @@
+import pytest
+from django.core.management import call_command
+
+from reviews.facets import get_facets
+from reviews.models import (
+    Category,
+    CategoryYearCount,
+    Genre,
+    GenreCategoryYearCount,
+    Title,
+)
+
+
+def counts(facet):
+    return {
+        row.get('slug', row.get('year')): row['count'] for row in facet
+    }
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23TitleFacets:
+
+    FACETS_URL = '/api/v1/titles/facets/'
+
+    @pytest.fixture
+    def catalog(self):
+        books = Category.objects.create(name='Книги', slug='books')
+        films = Category.objects.create(name='Фильмы', slug='films')
+        drama = Genre.objects.create(name='Драма', slug='drama')
+        comedy = Genre.objects.create(name='Комедия', slug='comedy')
+        first = Title.objects.create(name='Первое', year=2000, category=books)
+        first.genre.set([drama, comedy])
+        second = Title.objects.create(name='Второе', year=2000, category=films)
+        second.genre.set([drama])
+        third = Title.objects.create(name='Третье', year=2010, category=books)
+        third.genre.set([comedy])
+        return {
+            'books': books, 'films': films, 'drama': drama,
+            'comedy': comedy, 'titles': (first, second, third),
+        }
+
+    def test_01_counts_follow_titles(self, catalog):
+        facets = get_facets()
+        assert counts(facets['genres']) == {'drama': 2, 'comedy': 2}
+        assert counts(facets['categories']) == {'books': 2, 'films': 1}
+        assert counts(facets['years']) == {2000: 2, 2010: 1}
+
+        first, second, third = catalog['titles']
+        second.year = 2010
+        second.category = catalog['books']
+        second.save()
+        first.genre.remove(catalog['comedy'])
+        catalog['drama'].title_set.remove(second)
+        third.genre.add(catalog['drama'])
+        third.delete()
+
+        facets = get_facets()
+        assert counts(facets['genres']) == {'drama': 1}, (
+            'Проверьте, что счётчики жанров обновляются при изменении '
+            'произведений и их жанров.'
+        )
+        assert counts(facets['categories']) == {'books': 2}
+        assert counts(facets['years']) == {2000: 1, 2010: 1}
+
+    def test_02_disjunctive_filters(self, catalog):
+        facets = get_facets(genre='comedy', category='books')
+        assert counts(facets['genres']) == {'drama': 1, 'comedy': 2}, (
+            'Проверьте, что фасет жанров не учитывает фильтр по жанру.'
+        )
+        assert counts(facets['categories']) == {'books': 2}
+        assert counts(facets['years']) == {2000: 1, 2010: 1}
+
+        facets = get_facets(year=2000)
+        assert counts(facets['categories']) == {'books': 1, 'films': 1}
+        assert counts(facets['years']) == {2000: 2, 2010: 1}
+
+    def test_03_category_and_genre_delete(self, catalog):
+        catalog['films'].delete()
+        catalog['comedy'].delete()
+        facets = get_facets()
+        assert counts(facets['categories']) == {'books': 2}
+        assert counts(facets['genres']) == {'drama': 2}
+        assert counts(facets['years']) == {2000: 2, 2010: 1}, (
+            'Проверьте, что произведения удалённой категории остаются в '
+            'счётчиках по годам.'
+        )
+
+    def test_04_recount(self, catalog):
+        before = get_facets()
+        CategoryYearCount.objects.all().delete()
+        GenreCategoryYearCount.objects.update(count=0)
+        call_command('recount_counters')
+        assert get_facets() == before, (
+            'Проверьте, что команда `recount_counters` восстанавливает '
+            'счётчики фасетов.'
+        )
+
+    def test_05_endpoint(self, client, catalog,
+                         django_assert_max_num_queries):
+        with django_assert_max_num_queries(1 + 3):
+            response = client.get(self.FACETS_URL, {'genre': 'drama'})
+        assert response.status_code == 200
+        data = response.json()
+        assert counts(data['categories']) == {'books': 1, 'films': 1}
+        assert counts(data['genres']) == {'drama': 2, 'comedy': 2}
+
+        response = client.get(
+            self.FACETS_URL, {'name': 'Перв', 'category': 'films'}
+        )
+        data = response.json()
+        assert counts(data['categories']) == {'books': 1}, (
+            'Проверьте, что с фильтром по названию фасеты считаются по '
+            'отобранным произведениям.'
+        )
+        assert counts(data['genres']) == {}
+        assert counts(data['years']) == {}
+
+        response = client.get(self.FACETS_URL, {'year': 'abc'})
+        assert response.status_code == 400
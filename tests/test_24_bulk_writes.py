@@ -0,0 +1,148 @@
+from http import HTTPStatus
+
+import pytest
+from rest_framework.test import APIClient
+
+from reviews.facets import get_facets
+from reviews.models import Category, Genre, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24BulkWrites:
+
+    GENRES_BULK_URL = '/api/v1/genres/bulk/'
+    CATEGORIES_BULK_URL = '/api/v1/categories/bulk/'
+    TITLES_BULK_URL = '/api/v1/titles/bulk/'
+
+    def test_01_upsert_genres(self, admin_client):
+        Genre.objects.create(name='Старое имя', slug='drama')
+        response = admin_client.post(self.GENRES_BULK_URL, [
+            {'name': 'Драма', 'slug': 'drama'},
+            {'name': 'Комедия', 'slug': 'comedy'},
+            {'name': 'Сломанный', 'slug': ':-)'},
+        ], format='json')
+        assert response.status_code == HTTPStatus.CREATED
+        data = response.json()
+        assert [error['index'] for error in data['errors']] == [2], (
+            'Проверьте, что ошибки возвращаются для каждого объекта с его '
+            'индексом в запросе.'
+        )
+        assert dict(Genre.objects.values_list('slug', 'name')) == {
+            'drama': 'Драма', 'comedy': 'Комедия',
+        }, (
+            'Проверьте, что существующие слаги обновляются, а новые '
+            'создаются.'
+        )
+        assert admin_client.get('/api/v1/genres/').json()['count'] == 2
+
+    def test_02_bulk_requires_admin(self, user_client):
+        items = [{'name': 'Книги', 'slug': 'books'}]
+        for api_client in (user_client, APIClient()):
+            response = api_client.post(
+                self.CATEGORIES_BULK_URL, items, format='json'
+            )
+            assert response.status_code in (
+                HTTPStatus.FORBIDDEN, HTTPStatus.UNAUTHORIZED
+            )
+        assert not Category.objects.exists()
+
+    def test_03_create_titles(self, admin_client,
+                              django_assert_max_num_queries):
+        Category.objects.create(name='Книги', slug='books')
+        Genre.objects.create(name='Драма', slug='drama')
+        Genre.objects.create(name='Комедия', slug='comedy')
+        items = [
+            {'name': f'Книга {number}', 'year': 2000,
+             'genre': ['drama', 'comedy'], 'category': 'books'}
+            for number in range(20)
+        ]
+        items += [
+            {'name': 'Без жанра', 'year': 2000, 'genre': ['horror'],
+             'category': 'books'},
+            {'name': 'Без категории', 'year': 2000, 'genre': ['drama'],
+             'category': 'films'},
+            {'name': 'Из будущего', 'year': 3000, 'genre': ['drama'],
+             'category': 'books'},
+        ]
+        # Число запросов не зависит от числа произведений в пакете.
+        with django_assert_max_num_queries(24):
+            response = admin_client.post(
+                self.TITLES_BULK_URL, items, format='json'
+            )
+        assert response.status_code == HTTPStatus.CREATED
+        data = response.json()
+        assert len(data['results']) == 20
+        assert data['results'][0]['genre'] == [
+            {'name': 'Драма', 'slug': 'drama'},
+            {'name': 'Комедия', 'slug': 'comedy'},
+        ]
+        assert [
+            (error['index'], sorted(error['errors']))
+            for error in data['errors']
+        ] == [(20, ['genre']), (21, ['category']), (22, ['year'])]
+        assert Title.objects.count() == 20
+        assert Title.genre.through.objects.count() == 40
+
+        facets = get_facets()
+        assert {row['slug']: row['count'] for row in facets['genres']} == {
+            'drama': 20, 'comedy': 20,
+        }, 'Проверьте, что пакетная загрузка обновляет счётчики фасетов.'
+        assert facets['categories'][0]['count'] == 20
+
+        title = Title.objects.create(name='Ещё одна', year=2000)
+        assert title.pk > max(item['id'] for item in data['results']), (
+            'Проверьте, что ключи новых произведений не совпадают с '
+            'ключами загруженных пакетом.'
+        )
+
+    def test_04_invalid_payload(self, admin_client, settings):
+        response = admin_client.post(
+            self.TITLES_BULK_URL, {'name': 'Книга'}, format='json'
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+        settings.API_BULK_MAX_ITEMS = 1
+        response = admin_client.post(self.GENRES_BULK_URL, [
+            {'name': 'Драма', 'slug': 'drama'},
+            {'name': 'Комедия', 'slug': 'comedy'},
+        ], format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert not Genre.objects.exists()
+
+        response = admin_client.post(self.TITLES_BULK_URL, [
+            {'name': 'Книга', 'year': 2000, 'genre': [], 'category': 'x'},
+        ], format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert response.json()['errors'][0]['index'] == 0
+
+    def test_05_deleted_ids_are_not_reused(self, admin_client):
+        Category.objects.create(name='Книги', slug='books')
+        Genre.objects.create(name='Драма', slug='drama')
+        Title.objects.create(name='Первая', year=2000)
+        deleted = Title.objects.create(name='Вторая', year=2000)
+        deleted_id = deleted.id
+        deleted.delete()
+        response = admin_client.post(self.TITLES_BULK_URL, [
+            {'name': 'Новая', 'year': 2000, 'genre': ['drama'],
+             'category': 'books'},
+        ], format='json')
+        assert response.status_code == HTTPStatus.CREATED
+        assert response.json()['results'][0]['id'] > deleted_id, (
+            'Проверьте, что пакетная загрузка не отдаёт новым произведениям '
+            'ключи удалённых.'
+        )
+
+    def test_06_bulk_slug_is_reserved(self, admin_client):
+        for url in ('/api/v1/genres/', '/api/v1/categories/'):
+            response = admin_client.post(
+                url, {'name': 'Пакет', 'slug': 'bulk'}, format='json'
+            )
+            assert response.status_code == HTTPStatus.BAD_REQUEST, (
+                'Проверьте, что слаг `bulk` нельзя занять: он совпадает с '
+                f'путём `{url}bulk/`.'
+            )
+        response = admin_client.post(self.GENRES_BULK_URL, [
+            {'name': 'Пакет', 'slug': 'bulk'},
+        ], format='json')
+        assert response.json()['errors'][0]['index'] == 0
+        assert not Genre.objects.exists()
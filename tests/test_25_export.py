@@ -0,0 +1,81 @@
+import json
+from http import HTTPStatus
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+
+from reviews.models import Category, Comment, Genre, Review, Title, User
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25Export:
+
+    DATA_DIR = settings.BASE_DIR / 'static' / 'data'
+    EXPORT_URL_TEMPLATE = '/api/v1/export/{table}.{output}'
+
+    def dump(self):
+        dump = {}
+        for model in (Category, Genre, Title, Review, Comment):
+            # Дата изменения в формат load_data не входит.
+            fields = [
+                field.attname for field in model._meta.concrete_fields
+                if field.name != 'updated_at'
+            ]
+            dump[model.__name__] = list(
+                model.objects.order_by('pk').values(*fields)
+            )
+        return dump
+
+    def test_01_command_round_trip(self, tmp_path):
+        call_command('load_data', str(self.DATA_DIR))
+        before = self.dump()
+
+        call_command('export_data', str(tmp_path), chunk_size=7)
+        for model in (Comment, Review, Title, Genre, Category, User):
+            model.objects.all().delete()
+        call_command('load_data', str(tmp_path))
+
+        assert self.dump() == before, (
+            'Проверьте, что файлы команды `export_data` загружаются '
+            'командой `load_data` без потерь.'
+        )
+
+    def test_02_stream_ndjson(self, user_client):
+        call_command('load_data', str(self.DATA_DIR))
+        response = user_client.get(
+            self.EXPORT_URL_TEMPLATE.format(table='review', output='ndjson')
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert response.streaming, (
+            'Проверьте, что выгрузка отдаётся потоковым ответом.'
+        )
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        rows = [json.loads(line) for line in lines]
+        assert [row['id'] for row in rows] == list(
+            Review.objects.order_by('pk').values_list('pk', flat=True)
+        )
+        assert set(rows[0]) == {
+            'id', 'title_id', 'text', 'author', 'score', 'pub_date',
+        }
+
+    def test_03_csv_under_asgi(self, user_client, settings):
+        call_command('load_data', str(self.DATA_DIR))
+        settings.API_ASYNC_VIEWS = True
+        response = user_client.get(
+            self.EXPORT_URL_TEMPLATE.format(table='titles', output='csv')
+        )
+        assert response.status_code == HTTPStatus.OK
+        content = b''.join(response.streaming_content).decode()
+        assert content.startswith('id,name,year,category,description')
+        assert response['Content-Type'].startswith('text/csv')
+
+    def test_04_export_access(self, user_client, client):
+        url = self.EXPORT_URL_TEMPLATE.format(table='users', output='csv')
+        assert user_client.get(url).status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что таблица пользователей не выгружается через API.'
+        )
+        url = self.EXPORT_URL_TEMPLATE.format(table='titles', output='xml')
+        assert user_client.get(url).status_code == HTTPStatus.NOT_FOUND
+        url = self.EXPORT_URL_TEMPLATE.format(table='titles', output='csv')
+        assert client.get(url).status_code == HTTPStatus.UNAUTHORIZED
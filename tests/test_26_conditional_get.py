@@ -0,0 +1,102 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.cache import cache
+
+from reviews.models import Genre
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test26ConditionalGet:
+
+    GENRES_URL = '/api/v1/genres/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+
+    def test_01_if_none_match(self, client, settings,
+                              django_assert_num_queries):
+        settings.API_CACHE_TIMEOUT = 0
+        Genre.objects.create(name='Драма', slug='drama')
+        response = client.get(self.GENRES_URL)
+        etag = response['ETag']
+        assert response.has_header('Last-Modified')
+
+        with django_assert_num_queries(1):
+            response = client.get(self.GENRES_URL, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            'Проверьте, что на запрос с актуальным If-None-Match '
+            'возвращается 304 после одного запроса версий коллекций.'
+        )
+        assert response['ETag'] == etag
+
+        Genre.objects.create(name='Комедия', slug='comedy')
+        response = client.get(self.GENRES_URL, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что после изменения коллекции ETag меняется.'
+        )
+        assert response['ETag'] != etag
+        assert response.json()['count'] == 2
+
+    def test_02_if_modified_since(self, client):
+        Genre.objects.create(name='Драма', slug='drama')
+        response = client.get(self.GENRES_URL)
+        last_modified = response['Last-Modified']
+        response = client.get(
+            self.GENRES_URL, HTTP_IF_MODIFIED_SINCE=last_modified
+        )
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+        response = client.get(
+            self.GENRES_URL,
+            HTTP_IF_MODIFIED_SINCE='Mon, 01 Jan 2001 00:00:00 GMT',
+        )
+        assert response.status_code == HTTPStatus.OK
+
+    def test_03_nested_collections(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        reviews_url = self.REVIEWS_URL_TEMPLATE.format(
+            title_id=titles[0]['id']
+        )
+        other_url = self.REVIEWS_URL_TEMPLATE.format(
+            title_id=titles[1]['id']
+        )
+        etag = client.get(reviews_url)['ETag']
+        other_etag = client.get(other_url)['ETag']
+
+        create_single_review(admin_client, titles[0]['id'], 'Отзыв', 6)
+        response = client.get(reviews_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['count'] == 1
+        response = client.get(other_url, HTTP_IF_NONE_MATCH=other_etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            'Проверьте, что отзыв к одному произведению не меняет ETag '
+            'отзывов к другим.'
+        )
+
+    def test_04_updated_at(self, admin_client):
+        genre = Genre.objects.create(name='Драма', slug='drama')
+        created = genre.updated_at
+        admin_client.post(
+            '/api/v1/genres/bulk/',
+            [{'name': 'Драмы', 'slug': 'drama'}],
+            format='json',
+        )
+        genre.refresh_from_db()
+        assert genre.updated_at > created, (
+            'Проверьте, что пакетное обновление заполняет `updated_at`.'
+        )
+
+    def test_05_versions_are_shared(self, client):
+        Genre.objects.create(name='Драма', slug='drama')
+        etag = client.get(self.GENRES_URL)['ETag']
+        # Так выглядит кэш другого процесса, не видевшего записей.
+        cache.clear()
+        response = client.get(self.GENRES_URL, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            'Проверьте, что версии коллекций хранятся в базе, а не в '
+            'кэше процесса.'
+        )
+
+        Genre.objects.create(name='Комедия', slug='comedy')
+        cache.clear()
+        response = client.get(self.GENRES_URL, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK
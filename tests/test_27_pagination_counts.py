@@ -0,0 +1,108 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category, Genre, Review, Title
+
+
+def count_queries(context):
+    return [
+        query['sql'] for query in context.captured_queries
+        if 'COUNT(' in query['sql']
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test27PaginationCounts:
+
+    TITLES_URL = '/api/v1/titles/'
+    GENRES_URL = '/api/v1/genres/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+
+    @pytest.fixture
+    def titles(self, user):
+        category = Category.objects.create(name='Книги', slug='books')
+        drama = Genre.objects.create(name='Драма', slug='drama')
+        titles = []
+        for number in range(5):
+            title = Title.objects.create(
+                name=f'Книга {number}', year=2000 + number % 2,
+                category=category,
+            )
+            if number % 2:
+                title.genre.set([drama])
+            titles.append(title)
+        Review.objects.create(
+            title=titles[0], author=user, text='Отзыв', score=5
+        )
+        return titles
+
+    def get(self, client, url, params=None):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url, params)
+        assert response.status_code == 200
+        return response.json(), count_queries(context)
+
+    def test_01_counts_from_counters(self, client, titles):
+        data, counts = self.get(client, self.TITLES_URL, {'genre': 'drama'})
+        assert data['count'] == 2
+        assert not counts, (
+            'Проверьте, что число произведений с фильтром по жанру '
+            'берётся из счётчиков, а не из COUNT.'
+        )
+        data, counts = self.get(
+            client, self.TITLES_URL, {'category': 'books', 'year': 2001}
+        )
+        assert data['count'] == 2
+        assert not counts
+
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0].id)
+        data, counts = self.get(client, url)
+        assert data['count'] == 1
+        assert not counts, (
+            'Проверьте, что число отзывов берётся из счётчика произведения.'
+        )
+
+    def test_02_cached_counts(self, client, titles):
+        data, counts = self.get(client, self.TITLES_URL, {'limit': 2})
+        assert data['count'] == 5
+        assert len(counts) == 1
+        data, counts = self.get(
+            client, self.TITLES_URL, {'limit': 2, 'offset': 2}
+        )
+        assert data['count'] == 5
+        assert not counts, (
+            'Проверьте, что число объектов списка кэшируется для '
+            'следующих страниц.'
+        )
+
+        Title.objects.create(name='Новая', year=2000)
+        data, _ = self.get(client, self.TITLES_URL, {'limit': 2})
+        assert data['count'] == 6, (
+            'Проверьте, что изменение произведений сбрасывает кэш числа.'
+        )
+
+        self.get(client, self.GENRES_URL)
+        data, counts = self.get(client, self.GENRES_URL, {'page': 1})
+        assert data['count'] == 1
+        assert not counts
+
+    def test_03_without_count(self, client, titles):
+        data, counts = self.get(
+            client, self.TITLES_URL, {'limit': 3, 'count': 'false'}
+        )
+        assert 'count' not in data
+        assert not counts
+        assert len(data['results']) == 3
+        assert data['next'] is not None
+
+        data, counts = self.get(
+            client, self.TITLES_URL,
+            {'limit': 3, 'offset': 3, 'count': 'false'},
+        )
+        assert len(data['results']) == 2
+        assert data['next'] is None, (
+            'Проверьте, что с count=false на последней странице нет '
+            'ссылки на следующую.'
+        )
+        assert data['previous'] is not None
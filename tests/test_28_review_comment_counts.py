@@ -0,0 +1,146 @@
+import pytest
+from django.core.management import call_command
+from django.db.models.signals import pre_delete
+
+from api.v1.cache import get_versions
+from reviews.models import Comment, Review, Title
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test28ReviewCommentCounts:
+
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    COMMENTS_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+    )
+
+    def test_01_counts_follow_comments(self, admin_client, user_client,
+                                       client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        review = create_single_review(
+            admin_client, title_id, 'Отзыв', 5
+        ).json()
+        reviews_url = self.REVIEWS_URL_TEMPLATE.format(title_id=title_id)
+        comments_url = self.COMMENTS_URL_TEMPLATE.format(
+            title_id=title_id, review_id=review['id']
+        )
+        assert client.get(reviews_url).json()['results'][0][
+            'comment_count'
+        ] == 0
+
+        first = user_client.post(comments_url, data={'text': 'Один'}).json()
+        user_client.post(comments_url, data={'text': 'Два'})
+        assert Review.objects.get(pk=review['id']).comment_count == 2
+        assert client.get(reviews_url).json()['results'][0][
+            'comment_count'
+        ] == 2, (
+            'Проверьте, что число комментариев в списке отзывов '
+            'обновляется после добавления комментария.'
+        )
+
+        user_client.delete(f'{comments_url}{first["id"]}/')
+        assert Review.objects.get(pk=review['id']).comment_count == 1
+        assert client.get(comments_url).json()['count'] == 1
+
+        title = client.get(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title_id)
+        ).json()
+        assert title['review_count'] == 1, (
+            'Проверьте, что ответ с произведением содержит число отзывов.'
+        )
+
+    def test_02_save_keeps_counters(self, admin_client, user):
+        titles, _, _ = create_titles(admin_client)
+        stale_title = Title.objects.get(pk=titles[0]['id'])
+        review = Review.objects.create(
+            title=stale_title, author=user, text='Отзыв', score=5
+        )
+        stale_review = Review.objects.get(pk=review.pk)
+        Comment.objects.create(review=review, author=user, text='Коммент')
+
+        stale_review.text = 'Новый текст'
+        stale_review.save()
+        assert Review.objects.get(pk=review.pk).comment_count == 1, (
+            'Проверьте, что сохранение отзыва не затирает счётчик '
+            'комментариев.'
+        )
+        stale_title.name = 'Новое название'
+        stale_title.save()
+        title = Title.objects.get(pk=stale_title.pk)
+        assert (title.name, title.rating_count) == ('Новое название', 1), (
+            'Проверьте, что сохранение произведения не затирает счётчики '
+            'оценок.'
+        )
+
+    def test_03_recount(self, admin_client, user):
+        titles, _, _ = create_titles(admin_client)
+        review = Review.objects.create(
+            title_id=titles[0]['id'], author=user, text='Отзыв', score=5
+        )
+        Comment.objects.create(review=review, author=user, text='Коммент')
+        Review.objects.update(comment_count=0)
+        call_command('recount_counters')
+        assert Review.objects.get(pk=review.pk).comment_count == 1
+
+    def test_04_cascade_delete(self, admin_client, user, admin):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        first = Review.objects.create(
+            title_id=title_id, author=user, text='Отзыв', score=4
+        )
+        second = Review.objects.create(
+            title_id=title_id, author=admin, text='Отзыв', score=10
+        )
+        for review in (first, second, first):
+            Comment.objects.create(review=review, author=user, text='Текст')
+        namespaces = (f'reviews:{title_id}', f'comments:{first.pk}')
+        versions = get_versions(namespaces)
+
+        Comment.objects.filter(review=first).delete()
+        assert Review.objects.get(pk=first.pk).comment_count == 0, (
+            'Проверьте, что удаление нескольких комментариев одним запросом '
+            'сдвигает число комментариев отзыва.'
+        )
+        assert Review.objects.get(pk=second.pk).comment_count == 1
+        new_versions = get_versions(namespaces)
+        assert all(
+            new_versions[namespace][0] == versions[namespace][0] + 1
+            for namespace in namespaces
+        ), (
+            'Проверьте, что удаление повышает версию каждой коллекции '
+            'один раз.'
+        )
+
+        second.delete()
+        title = Title.objects.get(pk=title_id)
+        assert (title.rating_sum, title.rating_count) == (4, 1), (
+            'Проверьте, что удаление отзыва вместе с комментариями '
+            'сдвигает рейтинг произведения.'
+        )
+
+    def test_05_failed_delete(self, admin_client, user):
+        titles, _, _ = create_titles(admin_client)
+        title = Title.objects.get(pk=titles[0]['id'])
+        review = Review.objects.create(
+            title=title, author=user, text='Отзыв', score=5
+        )
+
+        def fail(sender, **kwargs):
+            raise RuntimeError('Удаление прервано')
+
+        pre_delete.connect(fail, sender=Title)
+        try:
+            with pytest.raises(RuntimeError):
+                title.delete()
+        finally:
+            pre_delete.disconnect(fail, sender=Title)
+
+        review.delete()
+        title = Title.objects.get(pk=title.pk)
+        assert (title.rating_sum, title.rating_count) == (0, 0), (
+            'Проверьте, что прерванное удаление произведения не мешает '
+            'сдвигать его рейтинг при следующих удалениях.'
+        )